@@ -4,9 +4,10 @@ Análise Fiscal com CrewAI - Agentes Especializados
 import os
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, ClassVar, FrozenSet
 from datetime import datetime
 
+import pandas as pd
 from crewai import Agent, Task, Crew, Process
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
@@ -53,6 +54,301 @@ class RelatorioExecutivoOutput(BaseModel):
 class RouterOutput(BaseModel):
     tipo_analise: str = Field(description="Tipo de análise: fisica|tributaria|risco|completa")
 
+# Prompts estáticos das tarefas de análise fiscal (formatados com .format() em create_fiscal_tasks)
+_PROMPT_FISICA_LOTE = """
+    IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
+
+    Dados REAIS para análise (NOTA FISCAL + RESUMO DE ITENS):
+    {data_summary}
+
+    VALIDAÇÃO DE DADOS E FORMATOS (sua especialidade):
+    - Verificar formatos de CPF/CNPJ (apenas números: 11 para CPF, 14 para CNPJ)
+    - Identificar campos mascarados com asteriscos (*) - INCONSISTÊNCIA CRÍTICA
+    - Verificar campos vazios, "nan" ou "None"
+    - Validar formatos de datas
+    - Verificar valores numéricos válidos
+    - Verificar quantidades positivas
+    - Verificar consistência entre valores da nota e soma dos itens
+
+    REGRAS CRÍTICAS:
+    1. Campos com asteriscos (*) são SEMPRE inconsistências críticas
+    2. CPF/CNPJ deve conter apenas números
+    3. Diferenças menores que R$ 1,00 são normalmente por arredondamento
+    4. Se não há problemas de formato/integridade, diga "Dados em conformidade"
+
+    FORMATO DE SAÍDA:
+    Retorne JSON válido com inconsistências físicas identificadas ou confirmação de conformidade.
+"""
+
+_PROMPT_TRIBUTARIA_LOTE = """
+    IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
+
+    Dados REAIS para análise (NOTA FISCAL + RESUMO DE ITENS):
+    {data_summary}
+
+    ANÁLISE TRIBUTÁRIA (sua especialidade):
+    - Verificar cálculos de ICMS, IPI, PIS, COFINS
+    - Validar alíquotas aplicadas
+    - Verificar bases de cálculo dos impostos
+    - Verificar CFOP correto para a operação
+    - Validar NCM dos produtos
+    - Verificar regime tributário aplicado
+    - Identificar possíveis evasões fiscais
+
+    REGRAS CRÍTICAS:
+    1. Se não há irregularidades tributárias, diga "Conformidade tributária verificada"
+    2. Baseie-se APENAS nos dados fornecidos
+    3. Foque APENAS em aspectos tributários, não em formatos de dados
+
+    FORMATO DE SAÍDA:
+    Retorne JSON válido com irregularidades tributárias identificadas ou confirmação de conformidade.
+"""
+
+_PROMPT_RISCO_LOTE = """
+    IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
+
+    Dados REAIS para análise (NOTA FISCAL + RESUMO DE ITENS):
+    {data_summary}
+
+    ANÁLISE DE RISCO E DETECÇÃO DE FRAUDES (sua especialidade):
+    - Identificar transações atípicas ou anômalas
+    - Detectar comportamentos inconsistentes
+    - Avaliar valores ou quantidades suspeitas
+    - Correlacionar dados para detectar inconsistências
+    - Identificar padrões que fogem do normal
+    - Avaliar contexto das transações
+    - Priorizar investigações por risco
+
+    REGRAS CRÍTICAS:
+    1. Se não há indicativos de fraude, diga "Padrões normais identificados"
+    2. Baseie-se APENAS nos dados fornecidos
+    3. Foque APENAS em riscos e padrões, não em formatos ou impostos
+
+    FORMATO DE SAÍDA:
+    Retorne JSON válido com padrões suspeitos identificados ou confirmação de normalidade.
+"""
+
+_PROMPT_CONSOLIDADA_LOTE = """
+    ANÁLISE CONSOLIDADA COM MEMÓRIA (sua especialidade):
+
+    {consolidated_context}
+
+    Analise os dados consolidados com memória de todos os lotes processados:
+    - Verifique consistência entre valor total da nota e soma de TODOS os itens
+    - Identifique inconsistências que só aparecem no conjunto completo
+    - Valide cálculos totais considerando todos os itens processados
+    - Detecte padrões que só são visíveis com visão completa
+
+    REGRAS CRÍTICAS:
+    1. Use a memória consolidada para análise completa
+    2. Foque em inconsistências que só aparecem com todos os dados
+    3. Se não há inconsistências consolidadas, diga "Análise consolidada em conformidade"
+    4. Considere tolerância de R$ 1,00 para arredondamentos
+
+    FORMATO DE SAÍDA:
+    Retorne JSON válido com inconsistências consolidadas ou confirmação de conformidade.
+"""
+
+_PROMPT_RELATOR_LOTE = """
+    IMPORTANTE: Consolide as análises anteriores baseado APENAS nos dados reais.
+
+    CONSOLIDAÇÃO E RELATÓRIO EXECUTIVO (sua especialidade):
+    - Agregar resultados dos outros agentes (Auditor Físico, Tributário, Risco, Análise Consolidada)
+    - Priorizar inconsistências por severidade
+    - Eliminar duplicações entre análises
+    - Incluir análise consolidada com memória de valores
+    - Criar recomendações estratégicas
+    - Elaborar plano de ação prioritário
+    - Destacar pontos críticos
+    - Fornecer visão consolidada completa
+
+    REGRAS CRÍTICAS:
+    1. Se não há inconsistências reportadas pelos outros agentes, diga "Dados em conformidade"
+    2. NÃO faça análises técnicas - apenas consolide resultados
+    3. Reporte APENAS o que os outros agentes realmente encontraram
+
+    FORMATO DE SAÍDA:
+    Retorne JSON válido com relatório executivo consolidado.
+"""
+
+_PROMPT_FISICA = """
+    IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
+
+    Dados REAIS para análise:
+    {data_summary}
+
+    VALIDAÇÃO DE DADOS E FORMATOS (sua especialidade):
+    - Verificar formatos de CPF/CNPJ (apenas números: 11 para CPF, 14 para CNPJ)
+    - Identificar campos mascarados com asteriscos (*) - INCONSISTÊNCIA CRÍTICA
+    - Verificar campos vazios, "nan" ou "None"
+    - Validar formatos de datas
+    - Verificar valores numéricos válidos
+    - Verificar quantidades positivas
+    - Verificar consistência entre valores da nota e soma dos itens
+
+    REGRAS CRÍTICAS:
+    1. Campos com asteriscos (*) são SEMPRE inconsistências críticas
+    2. CPF/CNPJ deve conter apenas números
+    3. Diferenças menores que R$ 1,00 são normalmente por arredondamento
+    4. Se não há problemas de formato/integridade, diga "Dados em conformidade"
+
+    FORMATO DE SAÍDA OBRIGATÓRIO:
+    Retorne APENAS um JSON válido com a seguinte estrutura:
+    {{
+        "inconsistencias": [
+            {{
+                "tipo": "arredondamento|duplicacao|campos_ausentes|calculos_incorretos|outros",
+                "descricao": "Descrição detalhada da inconsistência",
+                "severidade": "zero|baixa|media|alta|critica",
+                "evidencia": "Evidência específica dos dados",
+                "campo_afetado": "Nome do campo (se aplicável)",
+                "valor_esperado": "Valor esperado (se aplicável)",
+                "valor_encontrado": "Valor encontrado (se aplicável)",
+                "recomendacao": "Recomendação específica"
+            }}
+        ],
+        "resumo": "Resumo executivo em uma frase",
+        "severidade_geral": "zero|baixa|media|alta|critica"
+    }}
+
+    Tipo de análise: {analysis_type}
+"""
+
+_PROMPT_TRIBUTARIA = """
+    IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
+
+    Dados REAIS para análise:
+    {data_summary}
+
+    ANÁLISE TRIBUTÁRIA (sua especialidade):
+    - Verificar cálculos de ICMS, IPI, PIS, COFINS
+    - Validar alíquotas aplicadas
+    - Verificar bases de cálculo dos impostos
+    - Verificar CFOP correto para a operação
+    - Validar NCM dos produtos
+    - Verificar regime tributário aplicado
+    - Identificar possíveis evasões fiscais
+
+    REGRAS CRÍTICAS:
+    1. Se não há irregularidades tributárias, diga "Conformidade tributária verificada"
+    2. Baseie-se APENAS nos dados fornecidos
+    3. Foque APENAS em aspectos tributários, não em formatos de dados
+
+    FORMATO DE SAÍDA OBRIGATÓRIO:
+    Retorne APENAS um JSON válido com a seguinte estrutura:
+    {{
+        "inconsistencias": [
+            {{
+                "tipo": "tributo_incorreto|cfop_incorreto|ncm_incorreto|aliquota_incorreta|outros",
+                "descricao": "Descrição detalhada da irregularidade tributária",
+                "severidade": "zero|baixa|media|alta|critica",
+                "evidencia": "Evidência específica dos dados",
+                "campo_afetado": "Nome do campo tributário",
+                "valor_esperado": "Valor/alíquota esperado",
+                "valor_encontrado": "Valor/alíquota encontrado",
+                "recomendacao": "Recomendação específica"
+            }}
+        ],
+        "resumo": "Resumo executivo da conformidade tributária",
+        "severidade_geral": "zero|baixa|media|alta|critica"
+    }}
+
+    Tipo de análise: {analysis_type}
+"""
+
+_PROMPT_RISCO = """
+    IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
+
+    Dados REAIS para análise:
+    {data_summary}
+
+    ANÁLISE DE RISCO E DETECÇÃO DE FRAUDES (sua especialidade):
+    - Identificar transações atípicas ou anômalas
+    - Detectar comportamentos inconsistentes
+    - Avaliar valores ou quantidades suspeitas
+    - Correlacionar dados para detectar inconsistências
+    - Identificar padrões que fogem do normal
+    - Avaliar contexto das transações
+    - Priorizar investigações por risco
+
+    REGRAS CRÍTICAS:
+    1. Se não há indicativos de fraude, diga "Padrões normais identificados"
+    2. Baseie-se APENAS nos dados fornecidos
+    3. Foque APENAS em riscos e padrões, não em formatos ou impostos
+
+    FORMATO DE SAÍDA OBRIGATÓRIO:
+    Retorne APENAS um JSON válido com a seguinte estrutura:
+    {{
+        "inconsistencias": [
+            {{
+                "tipo": "padrao_suspeito|comportamento_anomalo|possivel_fraude|risco_fiscal|outros",
+                "descricao": "Descrição detalhada do padrão suspeito",
+                "severidade": "zero|baixa|media|alta|critica",
+                "evidencia": "Evidência específica dos dados",
+                "campo_afetado": "Campo relacionado ao risco",
+                "valor_esperado": "Comportamento esperado",
+                "valor_encontrado": "Comportamento encontrado",
+                "recomendacao": "Recomendação específica"
+            }}
+        ],
+        "resumo": "Resumo executivo dos riscos identificados",
+        "severidade_geral": "zero|baixa|media|alta|critica"
+    }}
+
+    Tipo de análise: {analysis_type}
+"""
+
+_PROMPT_RELATOR = """
+    IMPORTANTE: Consolide as análises anteriores baseado APENAS nos dados reais.
+
+    CONSOLIDAÇÃO E RELATÓRIO EXECUTIVO (sua especialidade):
+    - Agregar resultados dos outros agentes (Auditor Físico, Tributário, Risco)
+    - Priorizar inconsistências por severidade
+    - Eliminar duplicações entre análises
+    - Criar recomendações estratégicas
+    - Elaborar plano de ação prioritário
+    - Destacar pontos críticos
+    - Fornecer visão consolidada
+
+    REGRAS CRÍTICAS:
+    1. Se não há inconsistências reportadas pelos outros agentes, diga "Dados em conformidade"
+    2. NÃO faça análises técnicas - apenas consolide resultados
+    3. Reporte APENAS o que os outros agentes realmente encontraram
+
+    Dados das análises anteriores:
+    {data_summary}
+
+    FORMATO DE SAÍDA OBRIGATÓRIO:
+    Retorne APENAS um JSON válido com a seguinte estrutura:
+    {{
+        "inconsistencias": [
+            {{
+                "tipo": "tipo_da_inconsistencia",
+                "descricao": "Descrição detalhada consolidada",
+                "severidade": "zero|baixa|media|alta|critica",
+                "evidencia": "Evidência consolidada",
+                "campo_afetado": "Campo afetado",
+                "valor_esperado": "Valor esperado",
+                "valor_encontrado": "Valor encontrado",
+                "recomendacao": "Recomendação consolidada"
+            }}
+        ],
+        "resumo": "Resumo executivo consolidado",
+        "severidade_geral": "zero|baixa|media|alta|critica",
+        "recomendacoes": [
+            "Recomendação estratégica 1",
+            "Recomendação estratégica 2"
+        ],
+        "plano_acao": [
+            "Ação prioritária 1",
+            "Ação prioritária 2"
+        ],
+        "impacto_estimado": "Descrição do impacto estimado"
+    }}
+
+    Crie um relatório executivo claro, preciso e baseado nos dados reais analisados.
+"""
+
 class FiscalAnalyzer:
     """
     Analisador Fiscal com CrewAI - Sistema Multi-Agente
@@ -64,6 +360,25 @@ class FiscalAnalyzer:
     - Relator Executivo: Gera relatórios consolidados
     """
     
+    # Campos essenciais para análise fiscal (reduz uso de tokens)
+    ESSENTIAL_NOTE_FIELDS: ClassVar[Tuple[str, ...]] = (
+        'chave_de_acesso', 'data_emissão', 'número', 'série', 'modelo',
+        'cpf_cnpj_emitente', 'razão_social_emitente', 'uf_emitente', 'município_emitente',
+        'cnpj_destinatário', 'nome_destinatário', 'uf_destinatário',
+        'valor_nota_fiscal', 'natureza_da_operação', 'destino_da_operação',
+        'consumidor_final', 'presença_do_comprador'
+    )
+    
+    ESSENTIAL_ITEM_FIELDS: ClassVar[Tuple[str, ...]] = (
+        'número_produto', 'descrição_do_produto_serviço', 'código_ncm_sh',
+        'cfop', 'quantidade', 'unidade', 'valor_unitário', 'valor_total',
+        'icms_cst', 'icms_aliquota', 'icms_valor', 'ipi_cst', 'ipi_aliquota', 'ipi_valor',
+        'pis_cst', 'pis_valor', 'cofins_cst', 'cofins_valor'
+    )
+    
+    # Valores tratados como ausentes ao filtrar campos
+    _SENTINELS: ClassVar[FrozenSet[str]] = frozenset({'nan', '', 'None', 'NaN'})
+    
     def __init__(self, api_key: str):
         """
         Inicializa o analisador fiscal
@@ -78,22 +393,6 @@ class FiscalAnalyzer:
         openai_config = config.get_openai_config()
         self.llm = ChatOpenAI(**openai_config)
         
-        # Campos essenciais para análise fiscal (reduz uso de tokens)
-        self.ESSENTIAL_NOTE_FIELDS = [
-            'chave_de_acesso', 'data_emissão', 'número', 'série', 'modelo',
-            'cpf_cnpj_emitente', 'razão_social_emitente', 'uf_emitente', 'município_emitente',
-            'cnpj_destinatário', 'nome_destinatário', 'uf_destinatário',
-            'valor_nota_fiscal', 'natureza_da_operação', 'destino_da_operação',
-            'consumidor_final', 'presença_do_comprador'
-        ]
-        
-        self.ESSENTIAL_ITEM_FIELDS = [
-            'número_produto', 'descrição_do_produto_serviço', 'código_ncm_sh',
-            'cfop', 'quantidade', 'unidade', 'valor_unitário', 'valor_total',
-            'icms_cst', 'icms_aliquota', 'icms_valor', 'ipi_cst', 'ipi_aliquota', 'ipi_valor',
-            'pis_cst', 'pis_valor', 'cofins_cst', 'cofins_valor'
-        ]
-        
         # Tamanho do grupo para processar itens (economiza tokens)
         self.ITEMS_BATCH_SIZE = 10  # Processa 10 itens por vez
         
@@ -431,11 +730,11 @@ CONTEXTO DE MEMÓRIA (análise parcial):
         
         # Verificar se há itens para processar separadamente
         note = notes_data[0]
-        has_itens = 'itens_da_nota' in note or 'itens' in note
+        has_itens = bool(note.get('itens'))
         
         if has_itens:
             # Processar itens em lotes separados
-            itens = note.get('itens_da_nota') or note.get('itens', [])
+            itens = note.get('itens', [])
             
             if isinstance(itens, list) and len(itens) > 0:
                 # Preparar resumo da nota (sem todos os itens)
@@ -454,30 +753,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
                 # Adicionar tasks principais primeiro
                 # Tarefa 1: Auditoria Física (da nota)
                 task_auditoria_fisica = Task(
-                    description=f"""
-                    IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
-                    
-                    Dados REAIS para análise (NOTA FISCAL + RESUMO DE ITENS):
-                    {data_summary}
-                    
-                    VALIDAÇÃO DE DADOS E FORMATOS (sua especialidade):
-                    - Verificar formatos de CPF/CNPJ (apenas números: 11 para CPF, 14 para CNPJ)
-                    - Identificar campos mascarados com asteriscos (*) - INCONSISTÊNCIA CRÍTICA
-                    - Verificar campos vazios, "nan" ou "None"
-                    - Validar formatos de datas
-                    - Verificar valores numéricos válidos
-                    - Verificar quantidades positivas
-                    - Verificar consistência entre valores da nota e soma dos itens
-                    
-                    REGRAS CRÍTICAS:
-                    1. Campos com asteriscos (*) são SEMPRE inconsistências críticas
-                    2. CPF/CNPJ deve conter apenas números
-                    3. Diferenças menores que R$ 1,00 são normalmente por arredondamento
-                    4. Se não há problemas de formato/integridade, diga "Dados em conformidade"
-                    
-                    FORMATO DE SAÍDA:
-                    Retorne JSON válido com inconsistências físicas identificadas ou confirmação de conformidade.
-                    """,
+                    description=_PROMPT_FISICA_LOTE.format(data_summary=data_summary),
                     agent=agents['auditor_fisico'],
                     expected_output="JSON válido com inconsistências físicas identificadas",
                     output_json=AuditoriaFisicaOutput
@@ -502,29 +778,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
                 
                 # Tarefa 2: Auditoria Tributária (da nota)
                 task_auditoria_tributaria = Task(
-                    description=f"""
-                    IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
-                    
-                    Dados REAIS para análise (NOTA FISCAL + RESUMO DE ITENS):
-                    {data_summary}
-                    
-                    ANÁLISE TRIBUTÁRIA (sua especialidade):
-                    - Verificar cálculos de ICMS, IPI, PIS, COFINS
-                    - Validar alíquotas aplicadas
-                    - Verificar bases de cálculo dos impostos
-                    - Verificar CFOP correto para a operação
-                    - Validar NCM dos produtos
-                    - Verificar regime tributário aplicado
-                    - Identificar possíveis evasões fiscais
-                    
-                    REGRAS CRÍTICAS:
-                    1. Se não há irregularidades tributárias, diga "Conformidade tributária verificada"
-                    2. Baseie-se APENAS nos dados fornecidos
-                    3. Foque APENAS em aspectos tributários, não em formatos de dados
-                    
-                    FORMATO DE SAÍDA:
-                    Retorne JSON válido com irregularidades tributárias identificadas ou confirmação de conformidade.
-                    """,
+                    description=_PROMPT_TRIBUTARIA_LOTE.format(data_summary=data_summary),
                     agent=agents['auditor_tributario'],
                     expected_output="JSON válido com irregularidades tributárias identificadas",
                     output_json=AuditoriaTributariaOutput
@@ -533,29 +787,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
                 
                 # Tarefa 3: Análise de Risco (da nota)
                 task_analise_risco = Task(
-                    description=f"""
-                    IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
-                    
-                    Dados REAIS para análise (NOTA FISCAL + RESUMO DE ITENS):
-                    {data_summary}
-                    
-                    ANÁLISE DE RISCO E DETECÇÃO DE FRAUDES (sua especialidade):
-                    - Identificar transações atípicas ou anômalas
-                    - Detectar comportamentos inconsistentes
-                    - Avaliar valores ou quantidades suspeitas
-                    - Correlacionar dados para detectar inconsistências
-                    - Identificar padrões que fogem do normal
-                    - Avaliar contexto das transações
-                    - Priorizar investigações por risco
-                    
-                    REGRAS CRÍTICAS:
-                    1. Se não há indicativos de fraude, diga "Padrões normais identificados"
-                    2. Baseie-se APENAS nos dados fornecidos
-                    3. Foque APENAS em riscos e padrões, não em formatos ou impostos
-                    
-                    FORMATO DE SAÍDA:
-                    Retorne JSON válido com padrões suspeitos identificados ou confirmação de normalidade.
-                    """,
+                    description=_PROMPT_RISCO_LOTE.format(data_summary=data_summary),
                     agent=agents['analista_risco'],
                     expected_output="JSON válido com padrões suspeitos identificados",
                     output_json=AnaliseRiscoOutput
@@ -564,26 +796,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
                 
                 # Tarefa 4: Análise Consolidada com Memória (valores e consistência)
                 task_analise_consolidada = Task(
-                    description=f"""
-                    ANÁLISE CONSOLIDADA COM MEMÓRIA (sua especialidade):
-                    
-                    {self._get_consolidated_analysis_context()}
-                    
-                    Analise os dados consolidados com memória de todos os lotes processados:
-                    - Verifique consistência entre valor total da nota e soma de TODOS os itens
-                    - Identifique inconsistências que só aparecem no conjunto completo
-                    - Valide cálculos totais considerando todos os itens processados
-                    - Detecte padrões que só são visíveis com visão completa
-                    
-                    REGRAS CRÍTICAS:
-                    1. Use a memória consolidada para análise completa
-                    2. Foque em inconsistências que só aparecem com todos os dados
-                    3. Se não há inconsistências consolidadas, diga "Análise consolidada em conformidade"
-                    4. Considere tolerância de R$ 1,00 para arredondamentos
-                    
-                    FORMATO DE SAÍDA:
-                    Retorne JSON válido com inconsistências consolidadas ou confirmação de conformidade.
-                    """,
+                    description=_PROMPT_CONSOLIDADA_LOTE.format(consolidated_context=self._get_consolidated_analysis_context()),
                     agent=agents['auditor_fisico'],
                     expected_output="JSON válido com análise consolidada usando memória",
                     output_json=AuditoriaFisicaOutput
@@ -592,27 +805,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
                 
                 # Tarefa 5: Relatório Executivo (consolidado)
                 task_relatorio_executivo = Task(
-                    description=f"""
-                    IMPORTANTE: Consolide as análises anteriores baseado APENAS nos dados reais.
-                    
-                    CONSOLIDAÇÃO E RELATÓRIO EXECUTIVO (sua especialidade):
-                    - Agregar resultados dos outros agentes (Auditor Físico, Tributário, Risco, Análise Consolidada)
-                    - Priorizar inconsistências por severidade
-                    - Eliminar duplicações entre análises
-                    - Incluir análise consolidada com memória de valores
-                    - Criar recomendações estratégicas
-                    - Elaborar plano de ação prioritário
-                    - Destacar pontos críticos
-                    - Fornecer visão consolidada completa
-                    
-                    REGRAS CRÍTICAS:
-                    1. Se não há inconsistências reportadas pelos outros agentes, diga "Dados em conformidade"
-                    2. NÃO faça análises técnicas - apenas consolide resultados
-                    3. Reporte APENAS o que os outros agentes realmente encontraram
-                    
-                    FORMATO DE SAÍDA:
-                    Retorne JSON válido com relatório executivo consolidado.
-                    """,
+                    description=_PROMPT_RELATOR_LOTE,
                     agent=agents['relator_executivo'],
                     expected_output="JSON válido com relatório executivo consolidado",
                     output_json=RelatorioExecutivoOutput
@@ -626,48 +819,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
         
         # Tarefa 1: Auditoria Física (método tradicional para notas sem itens)
         task_auditoria_fisica = Task(
-            description=f"""
-            IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
-            
-            Dados REAIS para análise:
-            {data_summary}
-            
-            VALIDAÇÃO DE DADOS E FORMATOS (sua especialidade):
-            - Verificar formatos de CPF/CNPJ (apenas números: 11 para CPF, 14 para CNPJ)
-            - Identificar campos mascarados com asteriscos (*) - INCONSISTÊNCIA CRÍTICA
-            - Verificar campos vazios, "nan" ou "None"
-            - Validar formatos de datas
-            - Verificar valores numéricos válidos
-            - Verificar quantidades positivas
-            - Verificar consistência entre valores da nota e soma dos itens
-            
-            REGRAS CRÍTICAS:
-            1. Campos com asteriscos (*) são SEMPRE inconsistências críticas
-            2. CPF/CNPJ deve conter apenas números
-            3. Diferenças menores que R$ 1,00 são normalmente por arredondamento
-            4. Se não há problemas de formato/integridade, diga "Dados em conformidade"
-            
-            FORMATO DE SAÍDA OBRIGATÓRIO:
-            Retorne APENAS um JSON válido com a seguinte estrutura:
-            {{
-                "inconsistencias": [
-                    {{
-                        "tipo": "arredondamento|duplicacao|campos_ausentes|calculos_incorretos|outros",
-                        "descricao": "Descrição detalhada da inconsistência",
-                        "severidade": "zero|baixa|media|alta|critica",
-                        "evidencia": "Evidência específica dos dados",
-                        "campo_afetado": "Nome do campo (se aplicável)",
-                        "valor_esperado": "Valor esperado (se aplicável)",
-                        "valor_encontrado": "Valor encontrado (se aplicável)",
-                        "recomendacao": "Recomendação específica"
-                    }}
-                ],
-                "resumo": "Resumo executivo em uma frase",
-                "severidade_geral": "zero|baixa|media|alta|critica"
-            }}
-            
-            Tipo de análise: {analysis_type}
-            """,
+            description=_PROMPT_FISICA.format(data_summary=data_summary, analysis_type=analysis_type),
             agent=agents['auditor_fisico'],
             expected_output="JSON válido com inconsistências físicas identificadas",
             output_json=AuditoriaFisicaOutput
@@ -675,47 +827,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
         
         # Tarefa 2: Auditoria Tributária
         task_auditoria_tributaria = Task(
-            description=f"""
-            IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
-            
-            Dados REAIS para análise:
-            {data_summary}
-            
-            ANÁLISE TRIBUTÁRIA (sua especialidade):
-            - Verificar cálculos de ICMS, IPI, PIS, COFINS
-            - Validar alíquotas aplicadas
-            - Verificar bases de cálculo dos impostos
-            - Verificar CFOP correto para a operação
-            - Validar NCM dos produtos
-            - Verificar regime tributário aplicado
-            - Identificar possíveis evasões fiscais
-            
-            REGRAS CRÍTICAS:
-            1. Se não há irregularidades tributárias, diga "Conformidade tributária verificada"
-            2. Baseie-se APENAS nos dados fornecidos
-            3. Foque APENAS em aspectos tributários, não em formatos de dados
-            
-            FORMATO DE SAÍDA OBRIGATÓRIO:
-            Retorne APENAS um JSON válido com a seguinte estrutura:
-            {{
-                "inconsistencias": [
-                    {{
-                        "tipo": "tributo_incorreto|cfop_incorreto|ncm_incorreto|aliquota_incorreta|outros",
-                        "descricao": "Descrição detalhada da irregularidade tributária",
-                        "severidade": "zero|baixa|media|alta|critica",
-                        "evidencia": "Evidência específica dos dados",
-                        "campo_afetado": "Nome do campo tributário",
-                        "valor_esperado": "Valor/alíquota esperado",
-                        "valor_encontrado": "Valor/alíquota encontrado",
-                        "recomendacao": "Recomendação específica"
-                    }}
-                ],
-                "resumo": "Resumo executivo da conformidade tributária",
-                "severidade_geral": "zero|baixa|media|alta|critica"
-            }}
-            
-            Tipo de análise: {analysis_type}
-            """,
+            description=_PROMPT_TRIBUTARIA.format(data_summary=data_summary, analysis_type=analysis_type),
             agent=agents['auditor_tributario'],
             expected_output="JSON válido com irregularidades tributárias identificadas",
             output_json=AuditoriaTributariaOutput
@@ -723,47 +835,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
         
         # Tarefa 3: Análise de Risco
         task_analise_risco = Task(
-            description=f"""
-            IMPORTANTE: Analise APENAS os dados reais fornecidos abaixo. Não invente informações.
-            
-            Dados REAIS para análise:
-            {data_summary}
-            
-            ANÁLISE DE RISCO E DETECÇÃO DE FRAUDES (sua especialidade):
-            - Identificar transações atípicas ou anômalas
-            - Detectar comportamentos inconsistentes
-            - Avaliar valores ou quantidades suspeitas
-            - Correlacionar dados para detectar inconsistências
-            - Identificar padrões que fogem do normal
-            - Avaliar contexto das transações
-            - Priorizar investigações por risco
-            
-            REGRAS CRÍTICAS:
-            1. Se não há indicativos de fraude, diga "Padrões normais identificados"
-            2. Baseie-se APENAS nos dados fornecidos
-            3. Foque APENAS em riscos e padrões, não em formatos ou impostos
-            
-            FORMATO DE SAÍDA OBRIGATÓRIO:
-            Retorne APENAS um JSON válido com a seguinte estrutura:
-            {{
-                "inconsistencias": [
-                    {{
-                        "tipo": "padrao_suspeito|comportamento_anomalo|possivel_fraude|risco_fiscal|outros",
-                        "descricao": "Descrição detalhada do padrão suspeito",
-                        "severidade": "zero|baixa|media|alta|critica",
-                        "evidencia": "Evidência específica dos dados",
-                        "campo_afetado": "Campo relacionado ao risco",
-                        "valor_esperado": "Comportamento esperado",
-                        "valor_encontrado": "Comportamento encontrado",
-                        "recomendacao": "Recomendação específica"
-                    }}
-                ],
-                "resumo": "Resumo executivo dos riscos identificados",
-                "severidade_geral": "zero|baixa|media|alta|critica"
-            }}
-            
-            Tipo de análise: {analysis_type}
-            """,
+            description=_PROMPT_RISCO.format(data_summary=data_summary, analysis_type=analysis_type),
             agent=agents['analista_risco'],
             expected_output="JSON válido com padrões suspeitos identificados",
             output_json=AnaliseRiscoOutput
@@ -771,56 +843,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
         
         # Tarefa 4: Relatório Executivo (consolidado)
         task_relatorio_executivo = Task(
-            description=f"""
-            IMPORTANTE: Consolide as análises anteriores baseado APENAS nos dados reais.
-            
-            CONSOLIDAÇÃO E RELATÓRIO EXECUTIVO (sua especialidade):
-            - Agregar resultados dos outros agentes (Auditor Físico, Tributário, Risco)
-            - Priorizar inconsistências por severidade
-            - Eliminar duplicações entre análises
-            - Criar recomendações estratégicas
-            - Elaborar plano de ação prioritário
-            - Destacar pontos críticos
-            - Fornecer visão consolidada
-            
-            REGRAS CRÍTICAS:
-            1. Se não há inconsistências reportadas pelos outros agentes, diga "Dados em conformidade"
-            2. NÃO faça análises técnicas - apenas consolide resultados
-            3. Reporte APENAS o que os outros agentes realmente encontraram
-            
-            Dados das análises anteriores:
-            {data_summary}
-            
-            FORMATO DE SAÍDA OBRIGATÓRIO:
-            Retorne APENAS um JSON válido com a seguinte estrutura:
-            {{
-                "inconsistencias": [
-                    {{
-                        "tipo": "tipo_da_inconsistencia",
-                        "descricao": "Descrição detalhada consolidada",
-                        "severidade": "zero|baixa|media|alta|critica",
-                        "evidencia": "Evidência consolidada",
-                        "campo_afetado": "Campo afetado",
-                        "valor_esperado": "Valor esperado",
-                        "valor_encontrado": "Valor encontrado",
-                        "recomendacao": "Recomendação consolidada"
-                    }}
-                ],
-                "resumo": "Resumo executivo consolidado",
-                "severidade_geral": "zero|baixa|media|alta|critica",
-                "recomendacoes": [
-                    "Recomendação estratégica 1",
-                    "Recomendação estratégica 2"
-                ],
-                "plano_acao": [
-                    "Ação prioritária 1",
-                    "Ação prioritária 2"
-                ],
-                "impacto_estimado": "Descrição do impacto estimado"
-            }}
-            
-            Crie um relatório executivo claro, preciso e baseado nos dados reais analisados.
-            """,
+            description=_PROMPT_RELATOR.format(data_summary=data_summary),
             agent=agents['relator_executivo'],
             expected_output="JSON válido com relatório executivo consolidado",
             output_json=RelatorioExecutivoOutput
@@ -833,14 +856,18 @@ CONTEXTO DE MEMÓRIA (análise parcial):
             task_relatorio_executivo
         ]
     
-    def _filter_essential_fields(self, data: Dict, essential_fields: List[str]) -> Dict:
+    def _filter_essential_fields(self, data: Dict, essential_fields: Tuple[str, ...]) -> Dict:
         """Filtra apenas campos essenciais de um dicionário"""
         filtered = {}
+        sentinels = self._SENTINELS
         for field in essential_fields:
-            if field in data:
-                value = data[field]
-                if value and str(value) not in ['nan', '', 'None', None, 'NaN']:
-                    filtered[field] = value
+            value = data.get(field)
+            if not value:
+                continue
+            str_value = value if isinstance(value, str) else str(value)
+            if str_value in sentinels:
+                continue
+            filtered[field] = value
         return filtered
     
     def _prepare_note_summary(self, note: Dict) -> str:
@@ -876,6 +903,17 @@ CONTEXTO DE MEMÓRIA (análise parcial):
             batches.append(items[i:i + self.ITEMS_BATCH_SIZE])
         return batches
     
+    def _normalize_notes(self, notes_data: List[Dict]) -> List[Dict]:
+        """Padroniza o campo de itens das notas como 'itens' (aceita também 'itens_da_nota')"""
+        normalized = []
+        for note in notes_data:
+            if isinstance(note, dict) and 'itens' not in note and 'itens_da_nota' in note:
+                # Cópia rasa para não alterar o dicionário do chamador
+                note = dict(note)
+                note['itens'] = note.pop('itens_da_nota')
+            normalized.append(note)
+        return normalized
+    
     def _prepare_data_summary(self, notes_data: List[Dict], include_all_items: bool = False) -> str:
         """
         Prepara resumo otimizado dos dados para análise usando apenas campos essenciais
@@ -889,7 +927,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
         
         total = len(notes_data)
         note = notes_data[0]
-        has_itens = 'itens_da_nota' in note or 'itens' in note
+        has_itens = bool(note.get('itens'))
         
         # Criar resumo estruturado otimizado
         summary_lines = [
@@ -897,7 +935,7 @@ CONTEXTO DE MEMÓRIA (análise parcial):
         ]
         
         if has_itens:
-            itens = note.get('itens_da_nota') or note.get('itens', [])
+            itens = note.get('itens', [])
             total_itens = len(itens) if isinstance(itens, list) else 0
             summary_lines.append(f"Total de ITENS: {total_itens}")
         
@@ -914,8 +952,8 @@ CONTEXTO DE MEMÓRIA (análise parcial):
         
         # Processar itens se existirem (apenas resumo se não include_all_items)
         if has_itens:
-            itens = note.get('itens_da_nota') or note.get('itens', [])
-            if isinstance(itens, list) and len(itens) > 0:
+            itens = note.get('itens', [])
+            if isinstance(itens, list) and itens:
                 if include_all_items:
                     # Incluir todos os itens (usado quando processamos em lote)
                     items_summary = self._prepare_items_summary(itens, batch_size=len(itens))
@@ -924,12 +962,11 @@ CONTEXTO DE MEMÓRIA (análise parcial):
                 else:
                     # Apenas resumo (número de itens e primeiros 3)
                     summary_lines.append(f"\nITENS DA NOTA: {len(itens)} itens encontrados")
-                    if len(itens) > 0:
-                        items_summary = self._prepare_items_summary(itens[:min(3, len(itens))], batch_size=3)
-                        summary_lines.append(f"\nPrimeiros 3 itens:")
-                        summary_lines.append(items_summary)
-                        if len(itens) > 3:
-                            summary_lines.append(f"\n... e mais {len(itens) - 3} itens (serão analisados separadamente)")
+                    items_summary = self._prepare_items_summary(itens[:3], batch_size=3)
+                    summary_lines.append(f"\nPrimeiros 3 itens:")
+                    summary_lines.append(items_summary)
+                    if len(itens) > 3:
+                        summary_lines.append(f"\n... e mais {len(itens) - 3} itens (serão analisados separadamente)")
         
         return "\n".join(summary_lines)
 
@@ -1036,7 +1073,28 @@ CONTEXTO DE MEMÓRIA (análise parcial):
         Returns:
             Dicionário com resultados da análise
         """
+        # Sem notas não há o que analisar: evita montar a crew e disparar chamadas ao LLM
+        if not notes_data:
+            logger.info("Nenhuma nota fornecida - análise fiscal ignorada")
+            return {
+                "status": "success",
+                "analysis_type": analysis_type,
+                "timestamp_analysis": datetime.now().isoformat(),
+                "processing_time": 0.0,
+                "total_notes": 0,
+                "total_items": 0,
+                "total_value": 0.0,
+                "results": {
+                    "inconsistencias": [],
+                    "resumo": "Nenhum dado fornecido",
+                    "severidade_geral": "zero"
+                }
+            }
+        
         try:
+            # Padronizar campo de itens uma única vez
+            notes_data = self._normalize_notes(notes_data)
+            
             # Router de tarefas com IA
             if not analysis_type or analysis_type == "auto" or analysis_type == "inteligente":
                 analysis_type = self.route_analysis_task(notes_data, user_request)
@@ -1071,16 +1129,11 @@ CONTEXTO DE MEMÓRIA (análise parcial):
             
             # Verificar se notes_data tem itens
             if notes_data and isinstance(notes_data[0], dict):
-                if 'itens_da_nota' in notes_data[0]:
-                    total_items = len(notes_data[0].get('itens_da_nota', []))
-                # Tentar extrair valor total
-                for note in notes_data:
-                    if 'valor_nota_fiscal' in note:
-                        val_str = str(note['valor_nota_fiscal'])
-                        try:
-                            total_value += float(val_str.replace(',', '.'))
-                        except:
-                            pass
+                total_items = len(notes_data[0].get('itens') or [])
+                # Extrair valor total em uma única passada vetorizada (valores inválidos são ignorados)
+                valores = pd.Series([note.get('valor_nota_fiscal') for note in notes_data], dtype=object)
+                valores = pd.to_numeric(valores.astype(str).str.replace(',', '.', regex=False), errors='coerce')
+                total_value = float(valores.sum())
             
             # Processar resultados (compatibilidade retroativa)
             analysis_result = {
@@ -1103,8 +1156,6 @@ CONTEXTO DE MEMÓRIA (análise parcial):
                           f"Itens: R$ {self.analysis_memory['total_items_value']:.2f}, "
                           f"Diferença: R$ {abs(self.analysis_memory['note_total_value'] - self.analysis_memory['total_items_value']):.2f}")
 
-            print(crew_results)
-
             return analysis_result
             
         except Exception as e:
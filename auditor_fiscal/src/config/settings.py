@@ -2,7 +2,7 @@
 Configurações centralizadas do sistema de análise de dados CSV
 """
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
@@ -33,18 +33,25 @@ class AuditorConfig:
     log_level: str = "INFO"
     log_file: str = "logs/auditor.log"
     
+    # Caminho do banco resolvido na primeira chamada de get_db_path
+    _db_path_cache: Optional[Path] = field(default=None, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         if self.supported_formats is None:
             self.supported_formats = [".csv", ".xlsx", ".xls"]
     
     def get_db_path(self) -> Path:
         """Retorna o caminho do banco de dados"""
+        if self._db_path_cache is not None:
+            return self._db_path_cache
+        
         project_root = Path(__file__).parent.parent.parent
         db_path = project_root / "data" / "auditor_database.db"
         
         # Criar pasta data se não existir
         db_path.parent.mkdir(parents=True, exist_ok=True)
         
+        self._db_path_cache = db_path
         return db_path
     
     def get_openai_config(self) -> Dict[str, Any]:
@@ -10,6 +10,12 @@ import json
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 class AuditorService:
     """
     Serviço para gerenciar resultados de auditoria fiscal
@@ -123,8 +129,14 @@ class AuditorService:
             # Converter para tipos serializáveis
             serializable_result = _convert_to_json_serializable(ai_result)
             
-            # Serializar para JSON
-            return json.dumps(serializable_result, ensure_ascii=False)
+            # Serializar para JSON (orjson quando disponível, bem mais rápido para resultados grandes)
+            if ORJSON_AVAILABLE:
+                try:
+                    return orjson.dumps(serializable_result).decode('utf-8')
+                except orjson.JSONEncodeError as e:
+                    # orjson recusa o que o json aceita (ex.: inteiros acima de 64 bits): usar o json
+                    logger.debug(f"orjson não serializou o resultado, usando json: {e}")
+            return json.dumps(serializable_result, ensure_ascii=False, default=str)
                 
         except Exception as e:
             logger.error(f"Erro ao serializar resultado da IA: {str(e)}")
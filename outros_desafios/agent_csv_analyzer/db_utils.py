@@ -1,6 +1,6 @@
 import sqlite3
 import tempfile
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import threading
 
 class DatabaseManager:
@@ -8,21 +8,36 @@ class DatabaseManager:
         self.conn = None
         self.cursor = None
         self.db_path = None
-        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._insert_sql_cache: Dict[Tuple[str, Tuple[str, ...]], str] = {}
 
     def initialize(self):
         """Initialize SQLite database in memory"""
-        # Create a new connection for the current thread
-        self._local.conn = sqlite3.connect(':memory:')
-        self._local.cursor = self._local.conn.cursor()
+        # A single connection shared by all threads: each ':memory:' connection
+        # is its own database, so per-thread connections would not see the data
+        self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self.cursor = self.conn.cursor()
         return self
 
     def _get_connection(self):
-        """Get the connection for the current thread"""
-        if not hasattr(self._local, 'conn'):
-            self._local.conn = sqlite3.connect(':memory:')
-            self._local.cursor = self._local.conn.cursor()
-        return self._local.conn, self._local.cursor
+        """Get the shared connection, creating it on first use"""
+        if self.conn is None:
+            self.initialize()
+        return self.conn, self.cursor
+
+    def _get_insert_sql(self, table_name: str, sanitized_columns: List[str]) -> str:
+        """Build (once per table/columns) the INSERT statement used by executemany"""
+        key = (table_name, tuple(sanitized_columns))
+        insert_sql = self._insert_sql_cache.get(key)
+        if insert_sql is None:
+            escaped_columns = [self._escape_identifier(col) for col in sanitized_columns]
+            placeholders = ', '.join(['?' for _ in sanitized_columns])
+            insert_sql = f"""
+        INSERT INTO {self._escape_identifier(table_name)} ({', '.join(escaped_columns)})
+        VALUES ({placeholders})
+        """
+            self._insert_sql_cache[key] = insert_sql
+        return insert_sql
 
     def _escape_identifier(self, identifier: str) -> str:
         """Escape SQLite identifier (table or column name)"""
@@ -49,8 +64,6 @@ class DatabaseManager:
         if not data:
             return
 
-        conn, cursor = self._get_connection()
-
         # Create table with appropriate columns
         original_columns = list(data[0].keys())
         sanitized_columns = [self._sanitize_column_name(col) for col in original_columns]
@@ -65,48 +78,49 @@ class DatabaseManager:
             {', '.join(f'{col} TEXT' for col in escaped_columns)}
         )
         """
-        cursor.execute(create_table_sql)
 
         # Insert data with sanitized column names
-        placeholders = ', '.join(['?' for _ in sanitized_columns])
-        insert_sql = f"""
-        INSERT INTO {self._escape_identifier(table_name)} ({', '.join(escaped_columns)})
-        VALUES ({placeholders})
-        """
+        insert_sql = self._get_insert_sql(table_name, sanitized_columns)
         # Transform data to use sanitized column names
         transformed_data = []
         for row in data:
             transformed_row = [str(row[orig_col]) for orig_col in original_columns]
             transformed_data.append(transformed_row)
 
-        cursor.executemany(insert_sql, transformed_data)
-        conn.commit()
+        with self._lock:
+            conn, cursor = self._get_connection()
+            cursor.execute(create_table_sql)
+            cursor.executemany(insert_sql, transformed_data)
+            conn.commit()
 
     def get_schema_info(self) -> Dict[str, Any]:
         """Get schema information for all tables"""
-        conn, cursor = self._get_connection()
         schema_info = {}
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = cursor.fetchall()
-        
-        for table in tables:
-            table_name = table[0]
-            cursor.execute(f"PRAGMA table_info({self._escape_identifier(table_name)})")
-            columns = cursor.fetchall()
-            schema_info[table_name] = {
-                'columns': [col[1] for col in columns],
-                'types': [col[2] for col in columns]
-            }
+        with self._lock:
+            conn, cursor = self._get_connection()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            tables = cursor.fetchall()
+
+            for table in tables:
+                table_name = table[0]
+                cursor.execute(f"PRAGMA table_info({self._escape_identifier(table_name)})")
+                columns = cursor.fetchall()
+                schema_info[table_name] = {
+                    'columns': [col[1] for col in columns],
+                    'types': [col[2] for col in columns]
+                }
         return schema_info
 
     def execute_query(self, query: str) -> List[Dict[str, Any]]:
         """Execute a SQL query and return results"""
         try:
-            conn, cursor = self._get_connection()
             print(query)
-            cursor.execute(query)
-            columns = [description[0] for description in cursor.description]
-            results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            with self._lock:
+                conn, cursor = self._get_connection()
+                cursor.execute(query)
+                columns = [description[0] for description in cursor.description]
+                rows = cursor.fetchall()
+            results = [dict(zip(columns, row)) for row in rows]
             return results
         except Exception as e:
             print(e)
@@ -122,7 +136,8 @@ class DatabaseManager:
         with tempfile.NamedTemporaryFile(delete=False) as tmp:
             # Export the in-memory database to the temporary file
             backup = sqlite3.connect(tmp.name)
-            conn.backup(backup)
+            with self._lock:
+                conn.backup(backup)
             backup.close()
             
             # Read the file and return its contents
@@ -5,28 +5,97 @@ Baseado no padrão do agent_csv_analyzer
 """
 import os
 import sys
+import signal
+import socket
 import subprocess
-import threading
 import time
 import atexit
 
+# Endereço em que o servidor MCP (src/mcp_server.py) escuta
+MCP_HOST = "127.0.0.1"
+MCP_PORT = 8006
+MCP_READY_TIMEOUT = 10
+
+# Processo auxiliar que encerra o servidor MCP quando o processo principal
+# (substituído pelo Streamlit via exec) terminar. Argumentos: <pid_pai> <pid_mcp>
+MCP_WATCHDOG_CODE = """
+import os, signal, sys, time
+parent_pid, mcp_pid = int(sys.argv[1]), int(sys.argv[2])
+while True:
+    try:
+        os.kill(parent_pid, 0)
+    except ProcessLookupError:
+        break
+    time.sleep(1)
+try:
+    os.killpg(mcp_pid, signal.SIGTERM)
+except ProcessLookupError:
+    pass
+"""
+
+def _resolve_streamlit() -> str:
+    """Localiza o executável do Streamlit (resolvido uma única vez, na importação)."""
+    # Tenta encontrar o executável 'streamlit' no PATH do ambiente virtual
+    # sys.prefix aponta para o diretório raiz do ambiente virtual (.venv/)
+    streamlit_executable = os.path.join(sys.prefix, 'bin', 'streamlit')
+    if sys.platform == "win32": # Para Windows, o executável pode estar em Scripts
+        streamlit_executable = os.path.join(sys.prefix, 'Scripts', 'streamlit.exe')
+
+    # Fallback se não encontrar no ambiente virtual específico
+    if not os.path.exists(streamlit_executable):
+        streamlit_executable = 'streamlit'
+    return streamlit_executable
+
+_STREAMLIT_EXE = _resolve_streamlit()
+
+mcp_process = None
+streamlit_process = None
+
+def new_process_group_kwargs() -> dict:
+    """Argumentos do Popen para iniciar o filho em um novo grupo de processos."""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+def signal_process_group(process: subprocess.Popen, force: bool = False):
+    """Envia SIGTERM (ou SIGKILL) ao grupo do processo, alcançando também os netos."""
+    if sys.platform == "win32":
+        process.kill() if force else process.terminate()
+        return
+    try:
+        os.killpg(os.getpgid(process.pid), signal.SIGKILL if force else signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
 def cleanup_processes():
     """Limpa processos em execução"""
-    global mcp_process, streamlit_process
-    
-    if mcp_process:
-        print("Encerrando servidor MCP...")
-        mcp_process.terminate()
+    for name, process in (("servidor MCP", mcp_process), ("Streamlit", streamlit_process)):
+        if process is None or process.poll() is not None:
+            continue
+        
+        print(f"Encerrando {name}...")
         try:
-            mcp_process.wait(timeout=5)
-        except Exception:
-            print("Forçando encerramento do servidor MCP...")
-            mcp_process.kill()
-    else:
-        print(f"Erro ao encerrar servidor MCP: {e}")
+            signal_process_group(process)
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            print(f"Forçando encerramento do {name}...")
+            signal_process_group(process, force=True)
+        except Exception as e:
+            print(f"Erro ao encerrar {name}: {e}")
+
+def handle_shutdown_signal(signum, frame):
+    """Encerra os filhos assim que SIGINT/SIGTERM chega, sem depender do atexit."""
+    print(f"\n🛑 Sinal {signal.Signals(signum).name} recebido, encerrando...")
+    cleanup_processes()
+    sys.exit(0)
+
+def install_signal_handlers():
+    """Registra handle_shutdown_signal para SIGINT e SIGTERM."""
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, handle_shutdown_signal)
 
 def run_mcp_server():
-    """Inicia o servidor MCP em um novo processo."""
+    """Inicia o servidor MCP em um novo processo (sem aguardar seu término)."""
     global mcp_process
     print("Iniciando o servidor MCP...")
     mcp_server_path = os.path.join(os.path.dirname(__file__), 'src', 'mcp_server.py')
@@ -34,38 +103,74 @@ def run_mcp_server():
     if os.path.exists(mcp_server_path):
         # Inicia o servidor MCP como um processo separado.
         try:
+            # A saída herda o terminal (stdout/stderr=None, sem dup2 no filho): pipes
+            # do processo pai seriam fechados quando ele for substituído pelo Streamlit (exec)
             mcp_process = subprocess.Popen([sys.executable, mcp_server_path],
-                                         stdout=subprocess.PIPE,
-                                         stderr=subprocess.PIPE)
+                                         stdout=None,
+                                         stderr=None,
+                                         close_fds=True,
+                                         **new_process_group_kwargs())
             print("✅ Servidor MCP iniciado com sucesso!")
-            mcp_process.wait()
         except Exception as e:
             print(f"Ocorreu um erro ao iniciar o servidor MCP: {e}")
     else:
         print("ERRO: O arquivo 'mcp_server.py' não foi encontrado. Verifique o caminho.")
 
+def wait_for_mcp_server(timeout: float = MCP_READY_TIMEOUT) -> bool:
+    """Aguarda até o servidor MCP aceitar conexões (ou até o timeout)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # Processo já terminou: não adianta continuar esperando
+        if mcp_process is not None and mcp_process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection((MCP_HOST, MCP_PORT), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def spawn_detached(args: list):
+    """Inicia um processo em nova sessão sem guardar referência a ele.
+
+    Usa os.posix_spawn quando disponível (sem fork do interpretador);
+    nos demais sistemas recorre ao subprocess.Popen.
+    """
+    if hasattr(os, 'posix_spawn'):
+        os.posix_spawn(args[0], args, os.environ, setsid=True)
+    else:
+        subprocess.Popen(args, close_fds=True, **new_process_group_kwargs())
+
+def start_mcp_watchdog():
+    """Inicia um processo destacado que encerra o servidor MCP quando este processo terminar."""
+    if mcp_process is None or mcp_process.poll() is not None:
+        return
+    spawn_detached([sys.executable, '-c', MCP_WATCHDOG_CODE, str(os.getpid()), str(mcp_process.pid)])
+
 def run_streamlit_app():
-    """Inicia o aplicativo Streamlit em um novo processo."""
+    """Inicia o aplicativo Streamlit (substituindo este processo, exceto no Windows)."""
     global streamlit_process
     print("Iniciando o aplicativo Streamlit...")
     streamlit_app_path = os.path.join(os.path.dirname(__file__), 'src', 'web_interface.py')
 
     try:
-        # Tenta encontrar o executável 'streamlit' no PATH do ambiente virtual
-        # sys.prefix aponta para o diretório raiz do ambiente virtual (.venv/)
-        streamlit_executable = os.path.join(sys.prefix, 'bin', 'streamlit')
-        if sys.platform == "win32": # Para Windows, o executável pode estar em Scripts
-            streamlit_executable = os.path.join(sys.prefix, 'Scripts', 'streamlit.exe')
-
-        # Fallback se não encontrar no ambiente virtual específico
-        if not os.path.exists(streamlit_executable):
-            streamlit_executable = 'streamlit'
+        streamlit_executable = _STREAMLIT_EXE
+        if streamlit_executable == 'streamlit':
             print(f"AVISO: 'streamlit' não encontrado em {os.path.join(sys.prefix, 'bin')} ou {os.path.join(sys.prefix, 'Scripts')}. Tentando usar o 'streamlit' do PATH global.")
 
-        # Inicia o Streamlit como um processo separado.
+        if sys.platform != "win32":
+            # Substitui este processo pelo Streamlit: evita manter um processo
+            # Python extra só para aguardar. O watchdog encerra o MCP ao final.
+            start_mcp_watchdog()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execvp(streamlit_executable, [streamlit_executable, 'run', streamlit_app_path])
+
+        # Windows: inicia o Streamlit como um processo separado.
         # stdout e stderr são redirecionados para o terminal do main.py
         streamlit_process = subprocess.Popen([streamlit_executable, 'run', streamlit_app_path],
-                                   stdout=sys.stdout, stderr=sys.stderr)
+                                   stdout=sys.stdout, stderr=sys.stderr,
+                                   **new_process_group_kwargs())
         
         # Aguarda o processo terminar
         streamlit_process.wait()
@@ -82,24 +187,27 @@ def main():
     
     print("🚀 Iniciando a orquestração do projeto: Servidor MCP e Aplicativo Streamlit.")
     
-    # Cria e inicia uma thread para o servidor MCP.
+    # Ctrl+C e kill encerram os filhos na hora, inclusive durante o wait() do Streamlit
+    install_signal_handlers()
+    
     try:
-        mcp_thread = threading.Thread(target=run_mcp_server)
-        mcp_thread.daemon = True
-        mcp_thread.start()
+        # Popen já retorna imediatamente: não é preciso uma thread para o MCP
+        run_mcp_server()
         
-        print("Aguardando 3 segundos para o servidor MCP inicializar completamente...")
-        time.sleep(3) # Dá um pequeno tempo para o servidor MCP iniciar antes do Streamlit
-        
-        # Registra função de limpeza
+        # Limpeza para saídas normais (ex.: Streamlit encerrado no Windows)
         atexit.register(cleanup_processes)
         
+        print("Aguardando o servidor MCP aceitar conexões...")
+        if wait_for_mcp_server():
+            print("✅ Servidor MCP pronto!")
+        elif mcp_process is not None and mcp_process.poll() is not None:
+            print(f"ERRO: o servidor MCP encerrou durante a inicialização (código {mcp_process.returncode}). Iniciando o Streamlit mesmo assim.")
+        else:
+            print(f"AVISO: servidor MCP não respondeu em {MCP_READY_TIMEOUT}s em {MCP_HOST}:{MCP_PORT}. Iniciando o Streamlit mesmo assim.")
+        
         # Inicia o Streamlit
         run_streamlit_app()
         
-    except KeyboardInterrupt:
-        print("\n🛑 Interrompido pelo usuário")
-        cleanup_processes()
     except Exception as e:
         print(f"❌ Erro na orquestração: {e}")
         cleanup_processes()
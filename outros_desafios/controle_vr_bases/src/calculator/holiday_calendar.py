@@ -2,145 +2,179 @@
 Módulo para gerenciar calendário de feriados
 """
 import logging
-from datetime import datetime, date
-from typing import List, Dict, Set
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+from typing import List, Dict, Tuple, FrozenSet, Optional
 import calendar
 
+import numpy as np
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Janela de anos pré-calculada para consultas por ordinal e para as_dataframe
+# (as demais consultas calculam qualquer ano sob demanda)
+_YEARS = range(2020, 2030)
+
+# Feriados de data fixa, como (mês, dia)
+_NATIONAL_MD = (
+    (1, 1),    # Confraternização Universal
+    (4, 21),   # Tiradentes
+    (5, 1),    # Dia do Trabalhador
+    (9, 7),    # Independência do Brasil
+    (10, 12),  # Nossa Senhora Aparecida
+    (11, 2),   # Finados
+    (11, 15),  # Proclamação da República
+    (12, 25),  # Natal
+)
+
+_STATE_MD = {
+    'SP': ((7, 9),),              # Revolução Constitucionalista
+    'RJ': ((4, 23),               # São Jorge
+           (10, 2)),              # Aniversário do RJ
+    'RS': ((9, 20),),             # Revolução Farroupilha
+    'PR': ((12, 19),),            # Emancipação do Paraná
+}
+
+_MUNICIPAL_MD = {
+    'São Paulo': ((1, 25),),      # Aniversário de São Paulo
+    'Rio de Janeiro': ((3, 1),),  # Aniversário do Rio
+    'Porto Alegre': ((3, 26),),   # Aniversário de Porto Alegre
+    'Curitiba': ((3, 29),),       # Aniversário de Curitiba
+}
+
+def _expand(specs: Tuple[Tuple[int, int], ...], years) -> Dict[int, List[date]]:
+    """Expande uma lista de (mês, dia) em datas para cada ano"""
+    return {year: [date(year, month, day) for month, day in specs] for year in years}
+
+@lru_cache(maxsize=None)
+def _easter(year: int) -> date:
+    """Calcula a data da Páscoa para um ano específico"""
+    # Algoritmo de Gauss para calcular a Páscoa
+    a = year % 19
+    b = year // 100
+    c = year % 100
+    d = b // 4
+    e = b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i = c // 4
+    k = c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    n = (h + l - 7 * m + 114) // 31
+    p = (h + l - 7 * m + 114) % 31
+    
+    return date(year, n, p + 1)
+
+@lru_cache(maxsize=None)
+def _build_national_set(year: int) -> FrozenSet[date]:
+    """Retorna os feriados nacionais de um ano (compartilhado entre instâncias)"""
+    year_holidays = _expand(_NATIONAL_MD, (year,))[year]
+    
+    # Adicionar Páscoa (feriado móvel)
+    easter = _easter(year)
+    year_holidays.extend([
+        easter - timedelta(days=2),  # Sexta-feira Santa
+        easter,                      # Páscoa
+    ])
+    
+    # Adicionar Carnaval (feriado móvel)
+    carnival = easter - timedelta(days=47)  # 47 dias antes da Páscoa
+    year_holidays.extend([
+        carnival,                    # Carnaval
+        carnival + timedelta(days=1),  # Carnaval (segunda)
+    ])
+    
+    return frozenset(year_holidays)
+
+@lru_cache(maxsize=None)
+def _build_state_set(state: str, year: int) -> FrozenSet[date]:
+    """Retorna os feriados estaduais de um estado em um ano"""
+    return frozenset(_expand(_STATE_MD.get(state, ()), (year,))[year])
+
+@lru_cache(maxsize=None)
+def _build_municipal_set(city: str, year: int) -> FrozenSet[date]:
+    """Retorna os feriados municipais de uma cidade em um ano"""
+    return frozenset(_expand(_MUNICIPAL_MD.get(city, ()), (year,))[year])
+
+@lru_cache(maxsize=None)
+def _holidays_for_year(year: int, state: Optional[str], city: Optional[str]) -> FrozenSet[date]:
+    """Retorna todos os feriados de um (ano, estado, cidade), calculados na primeira consulta"""
+    holidays = _build_national_set(year)
+    if state:
+        holidays = holidays | _build_state_set(state, year)
+    if city:
+        holidays = holidays | _build_municipal_set(city, year)
+    return holidays
+
+@lru_cache(maxsize=None)
+def _holidays_for_month(year: int, month: int, state: Optional[str], city: Optional[str]) -> Tuple[date, ...]:
+    """Retorna os feriados de um mês, já ordenados"""
+    return tuple(sorted(h for h in _holidays_for_year(year, state, city) if h.month == month))
+
+@lru_cache(maxsize=None)
+def _window_ordinals(state: Optional[str], city: Optional[str]) -> FrozenSet[int]:
+    """Retorna os feriados dos anos de _YEARS como ordinais (date.toordinal())"""
+    return frozenset(h.toordinal() for year in _YEARS for h in _holidays_for_year(year, state, city))
+
+@lru_cache(maxsize=None)
+def _busdaycalendar(first_year: int, last_year: int, state: Optional[str], city: Optional[str]) -> np.busdaycalendar:
+    """Retorna o calendário de dias úteis do numpy (seg-sex menos feriados) para um intervalo de anos"""
+    holidays = sorted(h for year in range(first_year, last_year + 1) for h in _holidays_for_year(year, state, city))
+    return np.busdaycalendar(weekmask='1111100', holidays=np.array(holidays, dtype='datetime64[D]'))
+
+@lru_cache(maxsize=1)
+def _build_dataframe() -> pd.DataFrame:
+    """Monta a tabela de feriados de _YEARS usada por as_dataframe (poucas centenas de linhas)"""
+    rows = [(h, 'nacional', None) for year in _YEARS for h in sorted(_build_national_set(year))]
+    rows += [(h, 'estadual', state) for state in _STATE_MD for year in _YEARS
+             for h in sorted(_build_state_set(state, year))]
+    rows += [(h, 'municipal', city) for city in _MUNICIPAL_MD for year in _YEARS
+             for h in sorted(_build_municipal_set(city, year))]
+    
+    df = pd.DataFrame(rows, columns=['date', 'scope', 'scope_key'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    return df[['date', 'year', 'month', 'scope', 'scope_key']].set_index('date').sort_index(kind='stable')
+
+# Limites (em ordinais) da janela de anos coberta por _window_ordinals
+_WINDOW_START = date(_YEARS.start, 1, 1).toordinal()
+_WINDOW_END = date(_YEARS.stop, 1, 1).toordinal()
+
 class HolidayCalendar:
     """Classe para gerenciar feriados nacionais, estaduais e municipais"""
     
-    def __init__(self):
-        self.national_holidays = self._get_national_holidays()
-        self.state_holidays = self._get_state_holidays()
-        self.municipal_holidays = self._get_municipal_holidays()
+    # Todo o estado fica em caches de módulo/classe; instâncias não carregam atributos
+    __slots__ = ()
     
-    def _get_national_holidays(self) -> Dict[int, List[date]]:
-        """Retorna feriados nacionais por ano"""
-        holidays = {}
-        
-        for year in range(2020, 2030):  # 10 anos de feriados
-            year_holidays = [
-                date(year, 1, 1),    # Confraternização Universal
-                date(year, 4, 21),   # Tiradentes
-                date(year, 5, 1),    # Dia do Trabalhador
-                date(year, 9, 7),    # Independência do Brasil
-                date(year, 10, 12),  # Nossa Senhora Aparecida
-                date(year, 11, 2),   # Finados
-                date(year, 11, 15),  # Proclamação da República
-                date(year, 12, 25),  # Natal
-            ]
-            
-            # Adicionar Páscoa (feriado móvel)
-            easter = self._calculate_easter(year)
-            from datetime import timedelta
-            year_holidays.extend([
-                easter - timedelta(days=2),  # Sexta-feira Santa
-                easter,                      # Páscoa
-            ])
-            
-            # Adicionar Carnaval (feriado móvel)
-            carnival = easter - timedelta(days=47)  # 47 dias antes da Páscoa
-            year_holidays.extend([
-                carnival,                    # Carnaval
-                carnival + timedelta(days=1),  # Carnaval (segunda)
-            ])
-            
-            holidays[year] = year_holidays
-        
-        return holidays
+    def _scope(self, state: Optional[str], city: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Normaliza estado/cidade sem feriados cadastrados para None"""
+        if state not in _STATE_MD:
+            state = None
+        if city not in _MUNICIPAL_MD:
+            city = None
+        return state, city
     
-    def _get_state_holidays(self) -> Dict[str, Dict[int, List[date]]]:
-        """Retorna feriados estaduais por estado e ano"""
-        holidays = {}
-        
-        # Feriados de SP
-        holidays['SP'] = {}
-        for year in range(2020, 2030):
-            holidays['SP'][year] = [
-                date(year, 7, 9),    # Revolução Constitucionalista
-            ]
+    def _compute_month(self, year: int, month: int, state: str = None,
+                       city: str = None) -> Tuple[int, Tuple[date, ...], int]:
+        """Calcula em uma única passada o total de dias, os feriados e os dias úteis de um mês"""
+        first_weekday, total_days = calendar.monthrange(year, month)
+        holidays = _holidays_for_month(year, month, *self._scope(state, city))
         
-        # Feriados de RJ
-        holidays['RJ'] = {}
-        for year in range(2020, 2030):
-            holidays['RJ'][year] = [
-                date(year, 4, 23),   # São Jorge
-                date(year, 10, 2),   # Aniversário do RJ
-            ]
+        # Fins de semana (sábado = 5, domingo = 6): 2 por semana completa + os dias restantes
+        full_weeks, extra_days = divmod(total_days, 7)
+        weekend_days = 2 * full_weeks + sum(1 for i in range(extra_days) if (first_weekday + i) % 7 >= 5)
         
-        # Feriados de RS
-        holidays['RS'] = {}
-        for year in range(2020, 2030):
-            holidays['RS'][year] = [
-                date(year, 9, 20),   # Revolução Farroupilha
-            ]
+        # Feriados que caem em fim de semana já foram descontados acima
+        weekday_holidays = sum(1 for holiday in holidays if holiday.weekday() < 5)
+        working_days = total_days - weekend_days - weekday_holidays
         
-        # Feriados de PR
-        holidays['PR'] = {}
-        for year in range(2020, 2030):
-            holidays['PR'][year] = [
-                date(year, 12, 19),  # Emancipação do Paraná
-            ]
-        
-        return holidays
+        return total_days, holidays, working_days
     
-    def _get_municipal_holidays(self) -> Dict[str, Dict[int, List[date]]]:
-        """Retorna feriados municipais por cidade e ano"""
-        holidays = {}
-        
-        # Feriados de São Paulo
-        holidays['São Paulo'] = {}
-        for year in range(2020, 2030):
-            holidays['São Paulo'][year] = [
-                date(year, 1, 25),   # Aniversário de São Paulo
-            ]
-        
-        # Feriados de Rio de Janeiro
-        holidays['Rio de Janeiro'] = {}
-        for year in range(2020, 2030):
-            holidays['Rio de Janeiro'][year] = [
-                date(year, 3, 1),    # Aniversário do Rio
-            ]
-        
-        # Feriados de Porto Alegre
-        holidays['Porto Alegre'] = {}
-        for year in range(2020, 2030):
-            holidays['Porto Alegre'][year] = [
-                date(year, 3, 26),   # Aniversário de Porto Alegre
-            ]
-        
-        # Feriados de Curitiba
-        holidays['Curitiba'] = {}
-        for year in range(2020, 2030):
-            holidays['Curitiba'][year] = [
-                date(year, 3, 29),   # Aniversário de Curitiba
-            ]
-        
-        return holidays
-    
-    def _calculate_easter(self, year: int) -> date:
-        """Calcula a data da Páscoa para um ano específico"""
-        # Algoritmo de Gauss para calcular a Páscoa
-        a = year % 19
-        b = year // 100
-        c = year % 100
-        d = b // 4
-        e = b % 4
-        f = (b + 8) // 25
-        g = (b - f + 1) // 3
-        h = (19 * a + b - d - g + 15) % 30
-        i = c // 4
-        k = c % 4
-        l = (32 + 2 * e + 2 * i - h - k) % 7
-        m = (a + 11 * h + 22 * l) // 451
-        n = (h + l - 7 * m + 114) // 31
-        p = (h + l - 7 * m + 114) % 31
-        
-        return date(year, n, p + 1)
-    
-    def get_holidays_for_month(self, year: int, month: int, state: str = None, city: str = None) -> List[date]:
+    def get_holidays_for_month(self, year: int, month: int, state: str = None, city: str = None) -> Tuple[date, ...]:
         """
         Retorna todos os feriados de um mês específico
         
@@ -151,29 +185,9 @@ class HolidayCalendar:
             city: Cidade (opcional)
             
         Returns:
-            List[date]: Lista de feriados
+            Tuple[date, ...]: Feriados em ordem cronológica (tupla compartilhada; use list() se precisar alterar)
         """
-        holidays = []
-        
-        # Adicionar feriados nacionais
-        if year in self.national_holidays:
-            for holiday in self.national_holidays[year]:
-                if holiday.month == month:
-                    holidays.append(holiday)
-        
-        # Adicionar feriados estaduais
-        if state and state in self.state_holidays and year in self.state_holidays[state]:
-            for holiday in self.state_holidays[state][year]:
-                if holiday.month == month:
-                    holidays.append(holiday)
-        
-        # Adicionar feriados municipais
-        if city and city in self.municipal_holidays and year in self.municipal_holidays[city]:
-            for holiday in self.municipal_holidays[city][year]:
-                if holiday.month == month:
-                    holidays.append(holiday)
-        
-        return sorted(holidays)
+        return _holidays_for_month(year, month, *self._scope(state, city))
     
     def is_holiday(self, check_date: date, state: str = None, city: str = None) -> bool:
         """
@@ -187,13 +201,47 @@ class HolidayCalendar:
         Returns:
             bool: True se for feriado
         """
-        holidays = self.get_holidays_for_month(
-            check_date.year, 
-            check_date.month, 
-            state, 
-            city
-        )
-        return check_date in holidays
+        return check_date in _holidays_for_year(check_date.year, *self._scope(state, city))
+    
+    def is_holiday_ord(self, ordinal: int, state: str = None, city: str = None) -> bool:
+        """
+        Verifica se uma data, informada como ordinal (date.toordinal()), é feriado
+        
+        Versão de is_holiday para laços de agregação com muitas datas.
+        
+        Args:
+            ordinal: Ordinal da data a verificar
+            state: Estado (opcional)
+            city: Cidade (opcional)
+            
+        Returns:
+            bool: True se for feriado
+        """
+        if _WINDOW_START <= ordinal < _WINDOW_END:
+            return ordinal in _window_ordinals(*self._scope(state, city))
+        return self.is_holiday(date.fromordinal(ordinal), state, city)
+    
+    def working_days(self, start, end, state: str = None, city: str = None):
+        """
+        Conta os dias úteis no intervalo [start, end), via np.busday_count
+        
+        Args:
+            start: Data inicial (inclusive), escalar ou array
+            end: Data final (exclusive), escalar ou array
+            state: Estado (opcional)
+            city: Cidade (opcional)
+            
+        Returns:
+            Número de dias úteis (np.ndarray se start/end forem arrays)
+        """
+        start = np.asarray(start, dtype='datetime64[D]')
+        end = np.asarray(end, dtype='datetime64[D]')
+        if start.size == 0 or end.size == 0:
+            return np.busday_count(start, end, weekmask='1111100')
+        
+        years = np.concatenate([start.ravel(), end.ravel()]).astype('datetime64[Y]').astype(np.int64) + 1970
+        busdaycal = _busdaycalendar(int(years.min()), int(years.max()), *self._scope(state, city))
+        return np.busday_count(start, end, busdaycal=busdaycal)
     
     def get_working_days_in_month(self, year: int, month: int, state: str = None, city: str = None) -> int:
         """
@@ -208,27 +256,59 @@ class HolidayCalendar:
         Returns:
             int: Número de dias úteis
         """
-        # Obter todos os dias do mês
-        days_in_month = calendar.monthrange(year, month)[1]
-        
-        # Contar dias úteis (excluir fins de semana e feriados)
-        working_days = 0
-        holidays = self.get_holidays_for_month(year, month, state, city)
+        start = np.datetime64(f'{year:04d}-{month:02d}-01')
+        end = start + np.timedelta64(calendar.monthrange(year, month)[1], 'D')
+        return int(self.working_days(start, end, state, city))
+    
+    def get_working_days_bulk(self, pairs: List[Tuple[int, int]], state: str = None, city: str = None) -> np.ndarray:
+        """
+        Calcula o número de dias úteis de vários meses em uma única chamada vetorizada
         
-        for day in range(1, days_in_month + 1):
-            check_date = date(year, month, day)
-            
-            # Verificar se é fim de semana
-            if check_date.weekday() >= 5:  # Sábado = 5, Domingo = 6
-                continue
-            
-            # Verificar se é feriado
-            if check_date in holidays:
-                continue
+        Args:
+            pairs: Lista de (ano, mês)
+            state: Estado (opcional)
+            city: Cidade (opcional)
             
-            working_days += 1
+        Returns:
+            np.ndarray: Dias úteis de cada (ano, mês), na mesma ordem de pairs
+        """
+        months = np.array([(year - 1970) * 12 + (month - 1) for year, month in pairs], dtype='datetime64[M]')
+        start = months.astype('datetime64[D]')
+        end = (months + 1).astype('datetime64[D]')
+        return self.working_days(start, end, state, city)
+    
+    def as_dataframe(self) -> pd.DataFrame:
+        """
+        Retorna os feriados dos anos de 2020 a 2029 em formato tabular, para junções vetorizadas
         
-        return working_days
+        Returns:
+            pd.DataFrame: Colunas year, month, scope ('nacional', 'estadual', 'municipal')
+            e scope_key (estado/cidade), indexado por date
+        """
+        # Construída uma única vez por processo (lru_cache); cópia para o chamador poder alterar
+        return _build_dataframe().copy()
+    
+    def mask_holidays(self, dates: pd.Series, state: str = None, city: str = None) -> pd.Series:
+        """
+        Indica, para uma série de datas, quais são feriados (substitui N chamadas a is_holiday)
+        
+        Args:
+            dates: Série de datas (date, datetime ou string)
+            state: Estado (opcional)
+            city: Cidade (opcional)
+            
+        Returns:
+            pd.Series: Série booleana alinhada ao índice de dates
+        """
+        dates = pd.to_datetime(pd.Series(dates), errors='coerce')
+        # Converte para ordinal (date.toordinal()) a partir dos dias desde 1970-01-01
+        days = dates.to_numpy(dtype='datetime64[D]').astype(np.int64) + date(1970, 1, 1).toordinal()
+        state, city = self._scope(state, city)
+        years = dates.dt.year.dropna().unique()
+        ordinals = np.array(sorted(h.toordinal() for year in years
+                                   for h in _holidays_for_year(int(year), state, city)), dtype=np.int64)
+        mask = np.isin(days, ordinals) & dates.notna().to_numpy()
+        return pd.Series(mask, index=dates.index)
     
     def get_holiday_info(self, year: int, month: int, state: str = None, city: str = None) -> Dict[str, any]:
         """
@@ -243,9 +323,8 @@ class HolidayCalendar:
         Returns:
             Dict: Informações sobre feriados
         """
-        holidays = self.get_holidays_for_month(year, month, state, city)
-        working_days = self.get_working_days_in_month(year, month, state, city)
-        total_days = calendar.monthrange(year, month)[1]
+        total_days, holidays, working_days = self._compute_month(year, month, state, city)
+        holidays = list(holidays)
         
         return {
             'year': year,
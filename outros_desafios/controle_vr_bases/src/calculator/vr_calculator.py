@@ -1,16 +1,84 @@
 """
 Módulo de cálculos de VR/VA com integração ao banco de dados
 """
+import re
+import calendar
+import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List, Tuple, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Tuple, Optional
+from datetime import date
+from functools import lru_cache
 from config import config
 from database import VRDatabaseManager
 from .holiday_calendar import HolidayCalendar
 
 logger = logging.getLogger(__name__)
 
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _vacation_days_kernel(dias_vr, dias_ferias, dias_comprados, em_ferias, presente):
+        """Aplica férias e dias comprados aos dias de VR em uma única passada (compilado com Numba)"""
+        resultado = dias_vr.copy()
+        for i in range(resultado.shape[0]):
+            if em_ferias[i]:
+                if 0 < dias_ferias[i] < 22:
+                    resultado[i] = max(0.0, resultado[i] - dias_ferias[i])
+                else:
+                    resultado[i] = 0.0
+            if presente[i] and dias_comprados[i] > 0:
+                resultado[i] = min(22.0, resultado[i] + dias_comprados[i])
+        return resultado
+else:
+    def _vacation_days_kernel(dias_vr, dias_ferias, dias_comprados, em_ferias, presente):
+        """Aplica férias e dias comprados aos dias de VR (versão NumPy, sem Numba)"""
+        parciais = (dias_ferias > 0) & (dias_ferias < 22)
+        resultado = np.where(em_ferias, np.where(parciais, np.maximum(dias_vr - dias_ferias, 0), 0), dias_vr)
+        comprados = presente & (dias_comprados > 0)
+        return np.where(comprados, np.minimum(resultado + dias_comprados, 22), resultado)
+
+@lru_cache(maxsize=12)
+def _month_artifacts(ano: int, mes: int) -> Tuple[date, int]:
+    """Retorna (data de corte no dia 15, último dia do mês) do mês de referência"""
+    return date(ano, mes, 15), calendar.monthrange(ano, mes)[1]
+
+def _parse_dates(valores) -> pd.Series:
+    """
+    Converte datas 'AAAA-MM-DD' (com ou sem hora) de uma vez; valores inválidos viram NaT
+    
+    exact=False casa o formato no início do texto, dispensando o split da hora, e
+    cache=True converte cada texto distinto uma única vez.
+    """
+    return pd.to_datetime(pd.Series(valores).astype(str), format='%Y-%m-%d', exact=False,
+                          errors='coerce', cache=True)
+
+def _matricula_key(valores) -> pd.Series:
+    """
+    Chave de comparação de matrículas, sem alterar a coluna original
+    
+    Matrículas inteiras viram int ('1001', 1001 e 1001.0 casam entre si); as demais
+    ficam como o texto sem espaços. Vazias ou nulas viram <NA> e não casam com nada.
+    """
+    valores = pd.Series(valores)
+    numeros = pd.to_numeric(valores, errors='coerce')
+    texto = valores.astype('string').str.strip()
+    chave = texto.astype(object).where(texto.fillna('').ne(''), pd.NA).to_numpy(copy=True)
+    inteiros = (numeros % 1 == 0).fillna(False).to_numpy(dtype=bool)
+    chave[inteiros] = numeros[inteiros].astype('int64').tolist()
+    return pd.Series(chave, index=valores.index, dtype=object)
+
 class VRCalculator:
     """Classe responsável pelos cálculos de VR/VA com integração ao banco de dados"""
     
@@ -18,15 +86,64 @@ class VRCalculator:
         self.company_percentage = config.company_percentage
         self.employee_percentage = config.employee_percentage
         self.excluded_positions = config.excluded_positions
+        # Regex dos cargos excluídos, compilada uma única vez (sem distinção de maiúsculas)
+        self._cargo_re = re.compile('|'.join(map(re.escape, self.excluded_positions)), re.IGNORECASE)
         self.db_manager = db_manager
         self.holiday_calendar = HolidayCalendar()
+        # Tabela de desligados, lida uma vez por processamento (ver _get_desligados)
+        self._desligados_cache: Optional[pd.DataFrame] = None
+    
+    def _map_by_sindicato(self, df: pd.DataFrame, valores: Dict[str, Any], padrao: float) -> np.ndarray:
+        """
+        Mapeia um valor por sindicato para cada linha, via códigos da coluna categórica
+        
+        Converte 'sindicato' para category (se ainda não for) e consulta o dicionário
+        uma vez por categoria, em vez de uma vez por linha.
+        
+        Args:
+            df: DataFrame com a coluna 'sindicato' (convertida no próprio df)
+            valores: Valor por sindicato
+            padrao: Valor para sindicatos ausentes do dicionário, nulos ou sem sindicato
+            
+        Returns:
+            np.ndarray: Valor de cada linha
+        """
+        df['sindicato'] = df['sindicato'].astype('category')
+        sindicatos = df['sindicato'].cat
+        tabela = pd.Series(valores, dtype=float).reindex(sindicatos.categories).fillna(padrao).to_numpy()
+        # Código -1 (sindicato nulo) cai no último elemento
+        tabela = np.append(tabela, padrao)
+        return tabela[sindicatos.codes.to_numpy()]
     
-    def apply_exclusions_from_db(self, df_ativos: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    def _get_desligados(self, refresh: bool = False) -> pd.DataFrame:
+        """
+        Retorna a tabela de desligados (com a chave de matrícula), consultando o banco só uma vez
+        
+        A exclusão e a regra de desligamento filtram este mesmo DataFrame em memória.
+        
+        Args:
+            refresh: Se True, descarta o cache e consulta o banco de novo
+            
+        Returns:
+            pd.DataFrame: matricula, data_desligamento, data_comunicado_desligamento e chave
+        """
+        if refresh or self._desligados_cache is None:
+            desligados_query = """
+            SELECT matricula, data_desligamento, data_comunicado_desligamento 
+            FROM desligados
+            """
+            desl_df = pd.DataFrame(self.db_manager.execute_query_columnar(desligados_query))
+            desl_df['chave'] = _matricula_key(desl_df['matricula'])
+            self._desligados_cache = desl_df
+        return self._desligados_cache
+    
+    def apply_exclusions_from_db(self, df_ativos: pd.DataFrame, inplace: bool = False) -> Tuple[pd.DataFrame, List[str]]:
         """
         Aplica exclusões usando dados do banco de dados
         
         Args:
             df_ativos: DataFrame de funcionários ativos
+            inplace: Se True, altera df_ativos diretamente em vez de copiá-lo
             
         Returns:
             Tuple[pd.DataFrame, List[str]]: (funcionários_elegíveis, lista_de_exclusões)
@@ -37,74 +154,50 @@ class VRCalculator:
         
         logger.info("Aplicando exclusões usando banco de dados...")
         
-        df_resultado = df_ativos.copy()
+        df_resultado = df_ativos if inplace else df_ativos.copy()
         exclusoes_aplicadas = []
         
         try:
             # 1. Excluir por cargo (usar coluna original)
             if 'Cargo' in df_resultado.columns:
-                cargos_excluir = df_resultado['Cargo'].str.upper().str.contains('|'.join(self.excluded_positions), na=False)
+                cargos_excluir = df_resultado['Cargo'].str.contains(self._cargo_re, na=False)
                 excluidos_cargo = df_resultado[cargos_excluir]
                 df_resultado = df_resultado[~cargos_excluir]
                 exclusoes_aplicadas.append(f"Excluídos por cargo: {len(excluidos_cargo)} funcionários")
             
-            # 2. Excluir afastados
-            afastados_query = "SELECT matricula FROM afastados"
-            afastados_result = self.db_manager.execute_query(afastados_query)
-            afastados_matriculas = [row['matricula'] for row in afastados_result]
-            
-            # Converter matrículas do DataFrame para string para comparação
-            df_resultado['matricula'] = df_resultado['matricula'].astype(str)
-            
-            if afastados_matriculas:
-                afastados_mask = df_resultado['matricula'].isin(afastados_matriculas)
-                excluidos_afastados = df_resultado[afastados_mask]
-                df_resultado = df_resultado[~afastados_mask]
-                exclusoes_aplicadas.append(f"Excluídos afastados: {len(excluidos_afastados)} funcionários")
-            
-            # 3. Excluir estagiários
-            estagio_query = "SELECT matricula FROM estagio"
-            result = self.db_manager.execute_query(estagio_query)
-            estagio_matriculas = [int(row['matricula']) for row in result]
-            
-            if estagio_matriculas:
-                estagio_mask = df_resultado['matricula'].isin(estagio_matriculas)
-                excluidos_estagio = df_resultado[estagio_mask]
-                df_resultado = df_resultado[~estagio_mask]
-                exclusoes_aplicadas.append(f"Excluídos estagio: {len(excluidos_estagio)} funcionários")
-            
-            # 4. Excluir aprendizes
-            aprendiz_query = "SELECT matricula FROM aprendiz"
-            result = self.db_manager.execute_query(aprendiz_query)
-            aprendiz_matriculas = [int(row['matricula']) for row in result]
-            
-            if aprendiz_matriculas:
-                aprendiz_mask = df_resultado['matricula'].isin(aprendiz_matriculas)
-                excluidos_aprendiz = df_resultado[aprendiz_mask]
-                df_resultado = df_resultado[~aprendiz_mask]
-                exclusoes_aplicadas.append(f"Excluídos aprendiz: {len(excluidos_aprendiz)} funcionários")
-            
-            # 5. Excluir exterior
-            exterior_query = "SELECT matricula FROM exterior"
-            exterior_result = self.db_manager.execute_query(exterior_query)
-            exterior_matriculas = [row['matricula'] for row in exterior_result]
-            
-            if exterior_matriculas:
-                exterior_mask = df_resultado['matricula'].isin(exterior_matriculas)
-                excluidos_exterior = df_resultado[exterior_mask]
-                df_resultado = df_resultado[~exterior_mask]
-                exclusoes_aplicadas.append(f"Excluídos exterior: {len(excluidos_exterior)} funcionários")
-            
-            # 6. Excluir desligados
-            desligados_query = "SELECT matricula FROM desligados WHERE data_comunicado_desligamento IS NOT NULL"
-            desligados_result = self.db_manager.execute_query(desligados_query)
-            desligados_matriculas = [row['matricula'] for row in desligados_result]
-            
-            if desligados_matriculas:
-                desligados_mask = df_resultado['matricula'].isin(desligados_matriculas)
-                excluidos_desligados = df_resultado[desligados_mask]
-                df_resultado = df_resultado[~desligados_mask]
-                exclusoes_aplicadas.append(f"Excluídos desligados: {len(excluidos_desligados)} funcionários")
+            # 2. Excluir afastados, estagiários, aprendizes, exterior e desligados
+            # Uma única consulta traz todas as matrículas com o motivo da exclusão;
+            # a ordem define qual motivo é contabilizado quando a matrícula aparece em mais de uma tabela
+            exclusoes_query = """
+            SELECT matricula, 'afastados' AS motivo, 1 AS ordem FROM afastados
+            UNION ALL
+            SELECT matricula, 'estagio', 2 FROM estagio
+            UNION ALL
+            SELECT matricula, 'aprendiz', 3 FROM aprendiz
+            UNION ALL
+            SELECT matricula, 'exterior', 4 FROM exterior
+            """
+            exclusoes_result = self.db_manager.execute_query_columnar(exclusoes_query)
+            df_excl = pd.DataFrame(exclusoes_result)
+            
+            # Desligados com comunicado vêm da tabela em cache (recarregada a cada processamento)
+            desligados = self._get_desligados(refresh=True)
+            desligados = desligados.loc[desligados['data_comunicado_desligamento'].notna(), ['chave']]
+            
+            # Comparar pela chave de matrícula (mesmo tipo nos dois lados); chaves nulas nunca casam
+            df_excl['chave'] = _matricula_key(df_excl['matricula'])
+            df_excl = pd.concat([df_excl, desligados.assign(motivo='desligados', ordem=5)], ignore_index=True)
+            todos_motivos = df_excl['motivo'].unique()
+            df_excl = df_excl.dropna(subset=['chave']).sort_values('ordem', kind='stable')
+            
+            motivos = _matricula_key(df_resultado['matricula']).map(
+                df_excl.drop_duplicates('chave').set_index('chave')['motivo']
+            )
+            excluidos_por_motivo = motivos.value_counts()
+            df_resultado = df_resultado[motivos.isna()]
+            
+            for motivo in todos_motivos:
+                exclusoes_aplicadas.append(f"Excluídos {motivo}: {excluidos_por_motivo.get(motivo, 0)} funcionários")
             
             logger.info(f"Exclusões aplicadas via banco: {exclusoes_aplicadas}")
             
@@ -114,7 +207,8 @@ class VRCalculator:
         
         return df_resultado, exclusoes_aplicadas
     
-    def calculate_working_days_from_db(self, df_base: pd.DataFrame, ano: int, mes: int) -> pd.DataFrame:
+    def calculate_working_days_from_db(self, df_base: pd.DataFrame, ano: int, mes: int,
+                                       inplace: bool = False) -> pd.DataFrame:
         """
         Calcula dias úteis usando dados do banco de dados
         
@@ -122,6 +216,7 @@ class VRCalculator:
             df_base: DataFrame base com funcionários
             ano: Ano de referência
             mes: Mês de referência
+            inplace: Se True, altera df_base diretamente em vez de copiá-lo
             
         Returns:
             pd.DataFrame: DataFrame com dias úteis calculados
@@ -132,18 +227,18 @@ class VRCalculator:
         
         logger.info("Calculando dias úteis usando banco de dados...")
         
-        df_resultado = df_base.copy()
+        df_resultado = df_base if inplace else df_base.copy()
         
         try:
             # 1. Obter dias úteis por sindicato
             dias_uteis_query = "SELECT sindicato, dias_uteis_sindicato FROM dias_uteis"
-            dias_uteis_result = self.db_manager.execute_query(dias_uteis_query)
+            dias_uteis_result = self.db_manager.execute_query_columnar(dias_uteis_query)
             
             # Criar dicionário de dias úteis por sindicato
-            dias_uteis_dict = {row['sindicato']: row['dias_uteis_sindicato'] for row in dias_uteis_result}
+            dias_uteis_dict = dict(zip(dias_uteis_result['sindicato'], dias_uteis_result['dias_uteis_sindicato']))
             
             # 2. Aplicar dias úteis baseado no sindicato
-            df_resultado['dias_vr'] = df_resultado['sindicato'].map(dias_uteis_dict).fillna(22)
+            df_resultado['dias_vr'] = self._map_by_sindicato(df_resultado, dias_uteis_dict, 22)
             
             # 3. Aplicar regras de férias
             df_resultado = self._apply_vacation_rules_from_db(df_resultado)
@@ -153,6 +248,11 @@ class VRCalculator:
             # 5. Aplicar regras de admissão
             df_resultado = self._apply_admission_rules_from_db(df_resultado, ano, mes)
             
+            # O mapeamento por sindicato e as férias trabalham em float: voltar a dias inteiros
+            dias_vr = df_resultado['dias_vr'].to_numpy(dtype=float)
+            if np.isfinite(dias_vr).all() and (dias_vr % 1 == 0).all():
+                df_resultado['dias_vr'] = dias_vr.astype(np.int64)
+            
         except Exception as e:
             logger.error(f"Erro ao calcular dias úteis via banco: {e}")
             raise
@@ -183,55 +283,60 @@ class VRCalculator:
                    situacao
             FROM ferias
             """
-            ferias_result = self.db_manager.execute_query(ferias_query)
+            ferias_result = self.db_manager.execute_query_columnar(ferias_query)
             
-            if not ferias_result:
+            if not ferias_result['matricula']:
                 logger.info("Nenhum funcionário em férias encontrado")
                 return df
             
-            # Criar dicionário de férias por matrícula
-            ferias_dict = {row['matricula']: {
-                'dias_ferias': row['dias_ferias'],
-                'dias_comprados': row['dias_comprados'],
-                'situacao': row['situacao']
-            } for row in ferias_result}
-            
-            # Aplicar regras de férias
-            funcionarios_em_ferias = 0
-            funcionarios_ferias_parciais = 0
-            funcionarios_dias_comprados = 0
-            
-            for idx, row in df.iterrows():
-                matricula = row['matricula']
-                if matricula in ferias_dict:
-                    ferias_data = ferias_dict[matricula]
-                    dias_ferias = ferias_data['dias_ferias']
-                    dias_comprados = ferias_data['dias_comprados']
-                    situacao = ferias_data['situacao']
-                    
-                    # Verificar se está em férias
-                    if situacao and 'férias' in situacao.lower():
-                        funcionarios_em_ferias += 1
-                        
-                        # Aplicar regra de férias
-                        if dias_ferias > 0:
-                            if dias_ferias >= 22:  # Férias integrais
-                                df.at[idx, 'dias_vr'] = 0
-                                df.at[idx, 'observacao'] = f'Férias integrais - {dias_ferias} dias'
-                            else:  # Férias parciais
-                                df.at[idx, 'dias_vr'] = max(0, df.at[idx, 'dias_vr'] - dias_ferias)
-                                df.at[idx, 'observacao'] = f'Férias parciais - {dias_ferias} dias'
-                                funcionarios_ferias_parciais += 1
-                        else:
-                            # Em férias mas sem dias específicos - zerar
-                            df.at[idx, 'dias_vr'] = 0
-                            df.at[idx, 'observacao'] = 'Férias - sem dias específicos'
-                    
-                    # Aplicar regra de dias comprados
-                    if dias_comprados > 0:
-                        df.at[idx, 'dias_vr'] = min(22, df.at[idx, 'dias_vr'] + dias_comprados)
-                        df.at[idx, 'observacao'] = f'Dias comprados: +{dias_comprados} dias'
-                        funcionarios_dias_comprados += 1
+            # Alinhar os dados de férias às linhas do DataFrame (última linha vence em matrículas repetidas)
+            # dtype=object mantém os valores como vieram do banco, para o texto da observação
+            ferias = pd.DataFrame(ferias_result, dtype=object)
+            ferias['chave'] = _matricula_key(ferias['matricula'])
+            chave = _matricula_key(df['matricula'])
+            ferias = ferias.dropna(subset=['chave']).drop_duplicates('chave', keep='last')
+            ferias = ferias.set_index('chave')
+            presente = chave.isin(ferias.index)
+            ferias = ferias.reindex(chave)
+            ferias.index = df.index
+            
+            dias_ferias = pd.to_numeric(ferias['dias_ferias'])
+            dias_comprados = pd.to_numeric(ferias['dias_comprados'])
+            
+            # Máscaras de cada regra
+            # 'situacao' tem poucos valores distintos: testa cada categoria uma vez e indexa pelos códigos
+            situacao = ferias['situacao'].astype('category').cat
+            categoria_em_ferias = np.asarray(situacao.categories.str.contains('férias', case=False, regex=False), dtype=bool)
+            # Código -1 (situação nula) cai no último elemento
+            em_ferias = presente & np.append(categoria_em_ferias, False)[situacao.codes.to_numpy()]
+            integrais = em_ferias & (dias_ferias >= 22)
+            parciais = em_ferias & (dias_ferias > 0) & (dias_ferias < 22)
+            sem_dias = em_ferias & ~(dias_ferias > 0)
+            comprados = presente & (dias_comprados > 0)
+            
+            # Aplicar regras de férias e de dias comprados (máximo 22)
+            df['dias_vr'] = _vacation_days_kernel(
+                df['dias_vr'].to_numpy(dtype=float),
+                dias_ferias.to_numpy(dtype=float, na_value=np.nan),
+                dias_comprados.to_numpy(dtype=float, na_value=np.nan),
+                em_ferias.to_numpy(dtype=bool),
+                presente.to_numpy(dtype=bool),
+            )
+            
+            # Observações (dias comprados sobrescreve a de férias, como na ordem das regras)
+            texto_ferias = ferias['dias_ferias'].astype(str)
+            for mask, observacao in (
+                (integrais, 'Férias integrais - ' + texto_ferias + ' dias'),
+                (parciais, 'Férias parciais - ' + texto_ferias + ' dias'),
+                (sem_dias, 'Férias - sem dias específicos'),
+                (comprados, 'Dias comprados: +' + ferias['dias_comprados'].astype(str) + ' dias'),
+            ):
+                if mask.any():
+                    df.loc[mask, 'observacao'] = observacao[mask] if isinstance(observacao, pd.Series) else observacao
+            
+            funcionarios_em_ferias = int(em_ferias.sum())
+            funcionarios_ferias_parciais = int(parciais.sum())
+            funcionarios_dias_comprados = int(comprados.sum())
             
             logger.info(f"Regras de férias aplicadas:")
             logger.info(f"  - Funcionários em férias: {funcionarios_em_ferias}")
@@ -260,84 +365,55 @@ class VRCalculator:
             pd.DataFrame: DataFrame com regras de desligamento aplicadas
         """
         try:
-            from datetime import datetime, date
-            
-            # Obter dados de desligamento do banco
-            desligados_query = """
-            SELECT matricula, data_desligamento, data_comunicado_desligamento 
-            FROM desligados 
-            WHERE data_desligamento IS NOT NULL
-            """
-            desligados_result = self.db_manager.execute_query(desligados_query)
+            # Obter dados de desligamento (mesma consulta usada na exclusão)
+            desl_df = self._get_desligados()
+            desl_df = desl_df[desl_df['data_desligamento'].notna()]
             
-            if not desligados_result:
+            if desl_df.empty:
                 logger.info("Nenhum funcionário desligado encontrado")
                 return df
             
             # Data de corte: dia 15 do mês
-            data_corte = date(ano, mes, 15)
+            data_corte, _ = _month_artifacts(ano, mes)
+            
+            # Converter datas de desligamento de uma vez (datas inválidas viram NaT e são ignoradas)
+            datas = _parse_dates(desl_df['data_desligamento'])
             
             # Separar desligados por regra
-            desligados_excluir = []  # Comunicado até dia 15
-            desligados_proporcional = []  # Comunicado depois do dia 15
+            # Comunicado 'OK' é considerado como comunicado no dia 15; sem comunicado 'OK', excluir
+            no_mes = (datas.dt.year == ano) & (datas.dt.month == mes)
+            comunicado_ok = desl_df['data_comunicado_desligamento'].str.upper().eq('OK')
+            ate_dia_15 = datas.dt.day <= data_corte.day
             
-            for desligado in desligados_result:
-                matricula = desligado['matricula']
-                data_desligamento = desligado['data_desligamento']
-                data_comunicado = desligado['data_comunicado_desligamento']
-                
-                # Converter data de desligamento se for string
-                if isinstance(data_desligamento, str):
-                    try:
-                        data_desligamento = datetime.strptime(data_desligamento.split()[0], '%Y-%m-%d').date()
-                    except:
-                        continue
-                
-                # Verificar se o desligamento foi no mês de referência
-                if data_desligamento.year == ano and data_desligamento.month == mes:
-                    # Verificar data do comunicado
-                    if data_comunicado and data_comunicado.upper() == 'OK':
-                        # Se comunicado foi 'OK', considerar como comunicado no dia 15
-                        if data_desligamento.day <= 15:
-                            desligados_excluir.append(matricula)
-                        else:
-                            desligados_proporcional.append(matricula)
-                    else:
-                        # Se não há comunicado ou não é 'OK', excluir
-                        desligados_excluir.append(matricula)
+            desligados_excluir = set(desl_df.loc[no_mes & (~comunicado_ok | ate_dia_15), 'chave'].dropna())  # Comunicado até dia 15
+            desligados_proporcional = set(desl_df.loc[no_mes & comunicado_ok & ~ate_dia_15, 'chave'].dropna())  # Comunicado depois do dia 15
+            
+            # As duas máscaras saem do mesmo Index de matrículas, antes de filtrar o DataFrame
+            chave = _matricula_key(df['matricula'])
+            matriculas = pd.Index(chave)
+            mask_excluir = matriculas.isin(desligados_excluir)
+            mask_proporcional = matriculas.isin(desligados_proporcional) & ~mask_excluir
             
             # Aplicar exclusões
             if desligados_excluir:
-                mask_excluir = df['matricula'].isin(desligados_excluir)
                 df = df[~mask_excluir]
+                chave = chave[~mask_excluir]
+                mask_proporcional = mask_proporcional[~mask_excluir]
                 logger.info(f"Funcionários desligados excluídos (comunicado até dia 15): {mask_excluir.sum()}")
             
             # Aplicar regras proporcionais
             if desligados_proporcional:
-                mask_proporcional = df['matricula'].isin(desligados_proporcional)
-                df_proporcional = df[mask_proporcional].copy()
-                
-                # Calcular dias proporcionais para desligados
-                for idx in df_proporcional.index:
-                    matricula = df_proporcional.loc[idx, 'matricula']
-                    
-                    # Encontrar data de desligamento
-                    desligado_info = next((d for d in desligados_result if d['matricula'] == matricula), None)
-                    if desligado_info:
-                        data_desligamento = desligado_info['data_desligamento']
-                        if isinstance(data_desligamento, str):
-                            data_desligamento = datetime.strptime(data_desligamento.split()[0], '%Y-%m-%d').date()
-                        
-                        # Calcular dias proporcionais (do dia 1 até o dia do desligamento)
-                        dias_proporcionais = data_desligamento.day
-                        
-                        # Aplicar proporção aos dias de VR
-                        if 'dias_vr' in df_proporcional.columns:
-                            df_proporcional.loc[idx, 'dias_vr'] = dias_proporcionais
-                            df_proporcional.loc[idx, 'observacao'] = f'Desligamento proporcional - {dias_proporcionais} dias'
+                # Dias proporcionais (do dia 1 até o dia do desligamento), pelo primeiro registro da matrícula
+                dia_desligamento = datas.dt.day.groupby(desl_df['chave']).first()
+                dias_proporcionais = chave[mask_proporcional].map(dia_desligamento)
                 
-                # Atualizar DataFrame principal
-                df.loc[mask_proporcional] = df_proporcional
+                # Aplicar proporção aos dias de VR
+                if 'dias_vr' in df.columns and mask_proporcional.any():
+                    dias_proporcionais = dias_proporcionais.astype(int)
+                    df.loc[mask_proporcional, 'dias_vr'] = dias_proporcionais
+                    df.loc[mask_proporcional, 'observacao'] = (
+                        'Desligamento proporcional - ' + dias_proporcionais.astype(str) + ' dias'
+                    )
                 logger.info(f"Funcionários desligados com cálculo proporcional: {mask_proporcional.sum()}")
         
         except Exception as e:
@@ -362,62 +438,64 @@ class VRCalculator:
             pd.DataFrame: DataFrame com regras de admissão aplicadas
         """
         try:
-            from datetime import datetime, date
-            import calendar
-            
             # Obter dados de admissão do banco
             admissoes_query = """
             SELECT matricula, data_admissao 
             FROM admissoes 
             WHERE data_admissao IS NOT NULL
             """
-            admissoes_result = self.db_manager.execute_query(admissoes_query)
+            admissoes_result = self.db_manager.execute_query_columnar(admissoes_query)
             
-            if not admissoes_result:
+            if not admissoes_result['matricula']:
                 logger.info("Nenhuma admissão encontrada")
                 return df
             
             # Obter último dia do mês
-            ultimo_dia_mes = calendar.monthrange(ano, mes)[1]
-            
-            # Aplicar regras de admissão
-            for admissao in admissoes_result:
-                matricula = admissao['matricula']
-                data_admissao = admissao['data_admissao']
+            _, ultimo_dia_mes = _month_artifacts(ano, mes)
+            
+            # Converter datas de admissão de uma vez (datas inválidas viram NaT e são ignoradas)
+            adm_df = pd.DataFrame(admissoes_result)
+            adm_df['chave'] = _matricula_key(adm_df['matricula'])
+            datas = _parse_dates(adm_df['data_admissao'])
+            
+            # Manter só admissões no mês de referência (a última vence em matrículas repetidas)
+            no_mes = (datas.dt.year == ano) & (datas.dt.month == mes)
+            adm_df = adm_df[no_mes & adm_df['chave'].notna()].assign(dia=datas[no_mes].dt.day)
+            adm_df = adm_df.drop_duplicates('chave', keep='last').set_index('chave')
+            
+            # Calcular dias proporcionais (do dia da admissão até o final do mês)
+            dia_admissao = _matricula_key(df['matricula']).map(adm_df['dia'])
+            mask = dia_admissao.notna()
+            
+            # Aplicar proporção aos dias de VR
+            if mask.any() and 'dias_vr' in df.columns:
+                dia_admissao = dia_admissao[mask].astype(int)
+                dias_proporcionais = ultimo_dia_mes - dia_admissao + 1
+                df.loc[mask, 'dias_vr'] = dias_proporcionais
+                df.loc[mask, 'observacao'] = (
+                    'Admissão proporcional - ' + dias_proporcionais.astype(str) + ' dias (admitido em '
+                    + dia_admissao.astype(str) + f'/{mes})'
+                )
+                logger.info(f"Admissões no mês {mes}/{ano}: {int(mask.sum())} funcionários com VR proporcional")
                 
-                # Converter data de admissão se for string
-                if isinstance(data_admissao, str):
-                    try:
-                        data_admissao = datetime.strptime(data_admissao.split()[0], '%Y-%m-%d').date()
-                    except:
-                        continue
-                
-                # Verificar se a admissão foi no mês de referência
-                if data_admissao.year == ano and data_admissao.month == mes:
-                    # Verificar se funcionário está no DataFrame
-                    mask = df['matricula'] == matricula
-                    if mask.any():
-                        # Calcular dias proporcionais (do dia da admissão até o final do mês)
-                        dias_proporcionais = ultimo_dia_mes - data_admissao.day + 1
-                        
-                        # Aplicar proporção aos dias de VR
-                        if 'dias_vr' in df.columns:
-                            df.loc[mask, 'dias_vr'] = dias_proporcionais
-                            df.loc[mask, 'observacao'] = f'Admissão proporcional - {dias_proporcionais} dias (admitido em {data_admissao.day}/{mes})'
-                            
-                            logger.info(f"Funcionário {matricula}: admissão em {data_admissao.day}/{mes}, {dias_proporcionais} dias de VR")
+                # Detalhe por funcionário só em DEBUG, limitado a alguns exemplos
+                if logger.isEnabledFor(logging.DEBUG):
+                    exemplos = list(zip(df.loc[mask, 'matricula'].head(5).tolist(), dia_admissao.head(5).tolist(),
+                                        dias_proporcionais.head(5).tolist()))
+                    logger.debug(f"Exemplos (matrícula, dia da admissão, dias de VR): {exemplos}")
         
         except Exception as e:
             logger.error(f"Erro ao aplicar regras de admissão via banco: {e}")
         
         return df
     
-    def calculate_vr_values_from_db(self, df_base: pd.DataFrame) -> pd.DataFrame:
+    def calculate_vr_values_from_db(self, df_base: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         Calcula valores de VR usando dados do banco de dados
         
         Args:
             df_base: DataFrame base com funcionários
+            inplace: Se True, altera df_base diretamente em vez de copiá-lo
             
         Returns:
             pd.DataFrame: DataFrame com valores de VR calculados
@@ -428,21 +506,33 @@ class VRCalculator:
         
         logger.info("Calculando valores de VR usando banco de dados...")
         
-        df_resultado = df_base.copy()
+        df_resultado = df_base if inplace else df_base.copy()
         
         try:
             # 1. Obter valores por sindicato
             sindicatos_query = "SELECT sindicato, valor_dia_sindicato FROM sindicatos"
-            sindicatos_result = self.db_manager.execute_query(sindicatos_query)
+            sindicatos_result = self.db_manager.execute_query_columnar(sindicatos_query)
             
             # Criar dicionário de valores por sindicato
-            valores_dict = {row['sindicato']: row['valor_dia_sindicato'] for row in sindicatos_result}
+            valores_dict = dict(zip(sindicatos_result['sindicato'], sindicatos_result['valor_dia_sindicato']))
             
             # 2. Calcular valores de VR
-            df_resultado['valor_dia'] = df_resultado['sindicato'].map(valores_dict).fillna(0)
-            df_resultado['vr_total'] = df_resultado['dias_vr'] * df_resultado['valor_dia']
-            df_resultado['%_empresa'] = df_resultado['vr_total'] * self.company_percentage
-            df_resultado['%_colaborador'] = df_resultado['vr_total'] * self.employee_percentage
+            df_resultado['valor_dia'] = self._map_by_sindicato(df_resultado, valores_dict, 0)
+            dias_vr = df_resultado['dias_vr'].to_numpy(dtype=float)
+            valor_dia = df_resultado['valor_dia'].to_numpy(dtype=float)
+            if NUMEXPR_AVAILABLE:
+                # numexpr percorre os arrays em blocos, sem temporários do tamanho da tabela
+                vr_total = ne.evaluate('dias_vr * valor_dia')
+                empresa = ne.evaluate('vr_total * pct', local_dict={'vr_total': vr_total, 'pct': self.company_percentage})
+                colaborador = ne.evaluate('vr_total * pct', local_dict={'vr_total': vr_total, 'pct': self.employee_percentage})
+            else:
+                vr_total = dias_vr * valor_dia
+                empresa = vr_total * self.company_percentage
+                colaborador = vr_total * self.employee_percentage
+            
+            df_resultado['vr_total'] = vr_total
+            df_resultado['%_empresa'] = empresa
+            df_resultado['%_colaborador'] = colaborador
             
         except Exception as e:
             logger.error(f"Erro ao calcular valores de VR via banco: {e}")
@@ -461,8 +551,9 @@ class VRCalculator:
             pd.DataFrame: Resumo por sindicato
         """
         try:
-            resumo = df_final.groupby('sindicato').agg({
-                'matricula': 'count',
+            # observed=True: com 'sindicato' categórico, ignora categorias sem funcionários
+            resumo = df_final.groupby('sindicato', observed=True).agg({
+                'matricula': 'size',
                 'dias_vr': 'sum',
                 'vr_total': 'sum',
                 '%_empresa': 'sum',
@@ -477,3 +568,42 @@ class VRCalculator:
         except Exception as e:
             logger.error(f"Erro ao gerar resumo por sindicato: {e}")
             return pd.DataFrame()
+    
+    def generate_summary_by_sindicato_sql(self, result_table: str) -> pd.DataFrame:
+        """
+        Gera resumo por sindicato agregando direto no banco (GROUP BY)
+        
+        Alternativa a generate_summary_by_sindicato quando o resultado final já foi
+        gravado em uma tabela: só as linhas agregadas voltam do banco.
+        
+        Args:
+            result_table: Tabela com o resultado final (colunas matricula, sindicato,
+                dias_vr, vr_total, %_empresa e %_colaborador)
+            
+        Returns:
+            pd.DataFrame: Resumo por sindicato
+        """
+        if not self.db_manager:
+            logger.warning("Banco de dados não disponível")
+            return pd.DataFrame()
+        
+        try:
+            tabela = '"' + result_table.replace('"', '""') + '"'
+            resumo_query = f"""
+            SELECT sindicato,
+                   COUNT(matricula) AS total_funcionarios,
+                   ROUND(SUM(dias_vr), 2) AS total_dias_uteis,
+                   ROUND(SUM(vr_total), 2) AS total_vr,
+                   ROUND(SUM("%_empresa"), 2) AS total_empresa,
+                   ROUND(SUM("%_colaborador"), 2) AS total_colaborador
+            FROM {tabela}
+            GROUP BY sindicato
+            ORDER BY sindicato
+            """
+            resumo_result = self.db_manager.execute_query_columnar(resumo_query)
+            return pd.DataFrame(resumo_result, columns=['sindicato', 'total_funcionarios', 'total_dias_uteis',
+                                                        'total_vr', 'total_empresa', 'total_colaborador'])
+            
+        except Exception as e:
+            logger.error(f"Erro ao gerar resumo por sindicato via banco: {e}")
+            return pd.DataFrame()
@@ -1,19 +1,103 @@
 """
 Módulo para carregamento de planilhas Excel com integração ao banco de dados - CORRIGIDO
 """
+import hashlib
+import numpy as np
 import pandas as pd
 import logging
+import multiprocessing
+import os
 import re
+import stat
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from openpyxl import load_workbook
 from config import config
 from database import VRDatabaseManager
 
+# python-calamine (leitor XLSX em Rust) é opcional; sem ele lemos com openpyxl em modo read-only
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+# pyarrow é opcional: habilita o cache em Parquet das planilhas já limpas
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Cache das planilhas limpas, em pasta do próprio usuário (0700) e nunca no /tmp compartilhado:
+# outro usuário não pode plantar dados nela. A chave inclui o hash deste módulo, então
+# mudanças na limpeza invalidam o cache. Defina EXCEL_LOADER_NO_CACHE para ignorá-lo.
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'vr_excel'
+_CODE_VERSION = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+
 logger = logging.getLogger(__name__)
 
+def _private_cache_dir() -> Optional[Path]:
+    """
+    Garante CACHE_DIR como diretório do usuário atual, acessível só por ele (0700)
+    
+    Returns:
+        Path: CACHE_DIR, ou None se a pasta não puder ser usada com segurança
+    """
+    try:
+        CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        info = os.lstat(CACHE_DIR)
+        if not stat.S_ISDIR(info.st_mode):
+            logger.warning("Cache desabilitado: %s não é um diretório", CACHE_DIR)
+            return None
+        if hasattr(os, 'getuid'):
+            if info.st_uid != os.getuid():
+                logger.warning("Cache desabilitado: %s pertence a outro usuário", CACHE_DIR)
+                return None
+            if info.st_mode & 0o077:
+                os.chmod(CACHE_DIR, 0o700)
+    except OSError as e:
+        logger.warning("Cache desabilitado: não foi possível preparar %s: %s", CACHE_DIR, e)
+        return None
+    return CACHE_DIR
+
+@lru_cache(maxsize=512)
+def _identify(filename: str, name_index: Tuple[Tuple[str, str], ...]) -> Optional[str]:
+    """Tipo da planilha para o nome de arquivo (primeiro nome do índice contido nele)."""
+    filename_clean = filename.replace(".xlsx", "").upper()
+    return next((planilha_type for name_upper, planilha_type in name_index
+                 if name_upper in filename_clean), None)
+
+def _load_and_clean_worker(file_path: Path, planilha_type: str) -> Optional[pd.DataFrame]:
+    """Carrega e limpa um arquivo em um processo do pool (função de módulo para ser picklable)."""
+    return ExcelLoader()._load_and_clean_spreadsheet(file_path, planilha_type)
+
 class ExcelLoader:
     """Classe responsável por carregar planilhas Excel e integrar com banco de dados"""
     
+    # Padrões usados na limpeza dos nomes de colunas (compilados uma única vez)
+    _RE_NONWORD = re.compile(r'[^\w\s]')
+    _RE_SPACES = re.compile(r'\s+')
+    _RE_MULTI_US = re.compile(r'_+')
+    
+    # Colunas de texto com poucos valores distintos (armazenadas como category)
+    _CATEGORY_COLUMNS = ('empresa', 'cargo', 'situacao', 'sindicato', 'afastamento_tipo')
+    
+    # Abaixo deste volume total (bytes de XLSX) subir processos custa mais que ler em série
+    _PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+    
+    # Únicos tipos que historicamente têm mais de uma aba; os demais são lidos da primeira
+    _MULTI_SHEET_TYPES = frozenset({"sindicatos", "dias_uteis"})
+    
+    # Trechos de cabeçalho das únicas colunas mantidas pelos cleaners que descartam o resto
+    _USECOLS_KEYWORDS = {
+        "admissoes": ('matricula', 'admiss', 'cargo'),
+        "afastados": ('matricula', 'situacao', 'situação'),
+        "estagio": ('matricula', 'cargo', 'titulo'),
+    }
+    
     def __init__(self, db_manager: Optional[VRDatabaseManager] = None):
         self.data_folder = config.get_data_path()
         self.db_manager = db_manager
@@ -31,59 +115,125 @@ class ExcelLoader:
             "sindicatos": ["Base sindicato", "sindicato"],
             "dias_uteis": ["Base dias", "dias uteis", "dias_uteis"]
         }
+        
+        # Índice plano (NOME_EM_MAIÚSCULAS, tipo) na ordem do mapeamento;
+        # tupla para servir de chave do cache de _identify
+        self._name_index = tuple((name.upper(), planilha_type)
+                                 for planilha_type, names in self.file_mapping.items()
+                                 for name in names)
     
     def load_all_spreadsheets(self, load_to_db: bool = True) -> Dict[str, pd.DataFrame]:
         """
         Carrega todas as planilhas da pasta de dados e opcionalmente salva no banco
         
+        Cada planilha é gravada no banco assim que fica pronta (ver iter_spreadsheets).
+        
         Args:
             load_to_db: Se True, carrega os dados para o banco de dados
             
         Returns:
             Dict[str, pd.DataFrame]: Dicionário com nome da planilha e DataFrame
         """
+        spreadsheets = {}
+        load_to_db = load_to_db and self.db_manager is not None
+        
+        for planilha_type, df in self.iter_spreadsheets():
+            spreadsheets[planilha_type] = df
+            
+            # Carregar dados para o banco se solicitado e disponível
+            if load_to_db:
+                try:
+                    self.db_manager.load_one(planilha_type, df)
+                except Exception as e:
+                    logger.error(f"❌ Erro ao carregar dados no banco: {e}")
+                    raise
+        
+        if load_to_db and spreadsheets:
+            logger.info("✅ Dados carregados no banco de dados com sucesso")
+        
+        return spreadsheets
+    
+    def iter_spreadsheets(self) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Carrega as planilhas da pasta de dados, entregando uma de cada vez
+        
+        Permite processar (ex.: gravar no banco) e descartar cada DataFrame
+        sem manter todas as planilhas em memória ao mesmo tempo.
+        
+        Yields:
+            Tuple[str, pd.DataFrame]: Tipo da planilha e DataFrame limpo
+        """
         logger.info("Carregando planilhas...")
         
         if not self.data_folder.exists():
             raise FileNotFoundError(f"Pasta de dados não encontrada: {self.data_folder}")
         
-        # Buscar arquivos Excel
-        excel_files = list(self.data_folder.glob("*.xlsx"))
-        logger.info(f"Encontrados {len(excel_files)} arquivos XLSX")
-        
-        spreadsheets = {}
+        # Buscar arquivos Excel (extensão sem diferenciar maiúsculas: .xlsx e .XLSX)
+        excel_files = [p for p in self.data_folder.iterdir() if p.is_file() and p.suffix.lower() == '.xlsx']
+        logger.info("Encontrados %d arquivos XLSX", len(excel_files))
         
+        # Identificar tipo de cada planilha antes de distribuir a leitura
+        candidates: Dict[str, List[Path]] = {}
         for file_path in excel_files:
-            try:
-                # Identificar tipo de planilha
-                planilha_type = self._identify_spreadsheet_type(file_path.name)
-                
-                if planilha_type:
-                    # Carregar planilha com tratamento específico
-                    df = self._load_and_clean_spreadsheet(file_path, planilha_type)
-                    
-                    if df is not None and not df.empty:
-                        spreadsheets[planilha_type] = df
-                        logger.info(f"✅ Planilha carregada: {file_path.name} -> {planilha_type} ({len(df)} linhas)")
-                    else:
-                        logger.warning(f"⚠️ Planilha vazia ou com problemas: {file_path.name}")
-                else:
-                    logger.warning(f"⚠️ Arquivo não reconhecido: {file_path.name}")
-                    
-            except Exception as e:
-                logger.error(f"❌ Erro ao carregar {file_path.name}: {e}")
-        
-        # Carregar dados para o banco se solicitado e disponível
-        if load_to_db and self.db_manager and spreadsheets:
-            try:
-                logger.info("Carregando dados para o banco de dados...")
-                self.db_manager.load_spreadsheet_data(spreadsheets)
-                logger.info("✅ Dados carregados no banco de dados com sucesso")
-            except Exception as e:
-                logger.error(f"❌ Erro ao carregar dados no banco: {e}")
-                raise
+            planilha_type = self._identify_spreadsheet_type(file_path.name)
+            if planilha_type:
+                candidates.setdefault(planilha_type, []).append(file_path)
+            else:
+                logger.warning("⚠️ Arquivo não reconhecido: %s", file_path.name)
+        
+        # Vários arquivos do mesmo tipo (ex.: ESTÁGIO e ESTAGIO): ler só o mais recente
+        tasks = []
+        for planilha_type, paths in candidates.items():
+            file_path = max(paths, key=lambda p: p.stat().st_mtime)
+            for ignored in paths:
+                if ignored != file_path:
+                    logger.warning("⚠️ Arquivo ignorado: %s (%s já fornecido por %s, mais recente)",
+                                   ignored.name, planilha_type, file_path.name)
+            tasks.append((file_path, planilha_type))
+        
+        if not tasks:
+            return
+        
+        # Poucos arquivos pequenos (o caso comum) são lidos em série; o pool só compensa em volume
+        total_bytes = sum(file_path.stat().st_size for file_path, _ in tasks)
+        if len(tasks) > 1 and total_bytes >= self._PARALLEL_MIN_BYTES:
+            results = self._load_in_process_pool(tasks)
+        else:
+            results = ((file_path, planilha_type, self._load_and_clean_spreadsheet(file_path, planilha_type))
+                       for file_path, planilha_type in tasks)
+        
+        for file_path, planilha_type, df in results:
+            if df is not None and not df.empty:
+                logger.info("✅ Planilha carregada: %s -> %s (%d linhas)", file_path.name, planilha_type, len(df))
+                yield planilha_type, df
+            else:
+                logger.warning("⚠️ Planilha vazia ou com problemas: %s", file_path.name)
+    
+    def _load_in_process_pool(self, tasks: List[Tuple[Path, str]]) -> Iterator[Tuple[Path, str, Optional[pd.DataFrame]]]:
+        """
+        Carrega e limpa os arquivos em paralelo, entregando os resultados na ordem das tarefas
         
-        return spreadsheets
+        Cada arquivo é independente e a leitura do XLSX é CPU-bound: processos separados
+        evitam o GIL. Usa 'spawn' em vez de fork, que não é seguro em um processo com
+        threads (como o do Streamlit) e pode travar em locks de logging/importação.
+        
+        Args:
+            tasks: Lista de (arquivo, tipo da planilha)
+            
+        Yields:
+            Tuple[Path, str, pd.DataFrame]: Arquivo, tipo e DataFrame limpo (ou None)
+        """
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [(file_path, planilha_type, executor.submit(_load_and_clean_worker, file_path, planilha_type))
+                       for file_path, planilha_type in tasks]
+            
+            for file_path, planilha_type, future in futures:
+                try:
+                    yield file_path, planilha_type, future.result()
+                except Exception as e:
+                    logger.error("❌ Erro ao carregar %s: %s", file_path.name, e)
     
     def _identify_spreadsheet_type(self, filename: str) -> Optional[str]:
         """
@@ -95,15 +245,7 @@ class ExcelLoader:
         Returns:
             str: Tipo da planilha ou None se não reconhecida
         """
-        filename_clean = filename.replace(".xlsx", "").upper()
-        
-        # Mapear nome do arquivo para tipo
-        for planilha_type, possible_names in self.file_mapping.items():
-            for possible_name in possible_names:
-                if possible_name.upper() in filename_clean:
-                    return planilha_type
-        
-        return None
+        return _identify(filename, self._name_index)
     
     def _load_and_clean_spreadsheet(self, file_path: Path, planilha_type: str) -> Optional[pd.DataFrame]:
         """
@@ -117,37 +259,155 @@ class ExcelLoader:
             pd.DataFrame: DataFrame limpo ou None se houver erro
         """
         try:
-            # Ler todas as abas primeiro para identificar a principal
-            xl_file = pd.ExcelFile(file_path)
-            
-            # Escolher a aba principal
-            main_sheet = self._get_main_sheet(xl_file, planilha_type)
+            cache_path = None
+            if PYARROW_AVAILABLE and not os.environ.get('EXCEL_LOADER_NO_CACHE'):
+                cache_path = self._cache_path(file_path, planilha_type)
+            if cache_path is not None:
+                try:
+                    # Arquivo não mudou desde a última leitura: Parquet é muito mais rápido que o XLSX
+                    return pd.read_parquet(cache_path)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning("Cache inválido em %s, recriando: %s", cache_path, e)
             
-            # Carregar dados
-            df = pd.read_excel(file_path, sheet_name=main_sheet)
+            if CALAMINE_AVAILABLE and planilha_type in self._MULTI_SHEET_TYPES:
+                # Abrir o arquivo uma única vez: a mesma pasta de trabalho serve para
+                # identificar a aba principal e para ler os dados
+                with pd.ExcelFile(file_path, engine="calamine") as xl_file:
+                    # Escolher a aba principal
+                    main_sheet = self._get_main_sheet(xl_file.sheet_names, planilha_type)
+                    
+                    # Carregar dados
+                    df = pd.read_excel(xl_file, sheet_name=main_sheet,
+                                       usecols=self._usecols_for(planilha_type))
+            elif CALAMINE_AVAILABLE:
+                # Planilha de aba única: lê direto a primeira, sem listar as abas
+                df = pd.read_excel(file_path, sheet_name=0, engine="calamine",
+                                   usecols=self._usecols_for(planilha_type))
+            else:
+                df = self._load_via_openpyxl_readonly(file_path, planilha_type)
             
             # Limpar e tratar dados
             df_clean = self._clean_dataframe(df, planilha_type)
             
+            if cache_path is not None:
+                self._write_cache(df_clean, cache_path)
+            
             return df_clean
             
         except Exception as e:
-            logger.error(f"Erro ao processar {file_path.name}: {e}")
+            logger.error("Erro ao processar %s: %s", file_path.name, e)
+            return None
+    
+    def _cache_path(self, file_path: Path, planilha_type: str) -> Optional[Path]:
+        """
+        Caminho do cache Parquet para o arquivo, derivado de caminho, tamanho e mtime
+        
+        Qualquer alteração no arquivo (ou no código de limpeza) gera outra chave.
+        Retorna None quando a pasta de cache não é segura (cache desabilitado).
+        """
+        cache_dir = _private_cache_dir()
+        if cache_dir is None:
+            return None
+        
+        file_stat = file_path.stat()
+        fingerprint = f"{file_path.resolve()}|{file_stat.st_size}|{file_stat.st_mtime_ns}|{planilha_type}|{_CODE_VERSION}"
+        key = hashlib.blake2b(fingerprint.encode('utf-8'), digest_size=8).hexdigest()
+        return cache_dir / f"{key}.parquet"
+    
+    def _write_cache(self, df: pd.DataFrame, cache_path: Path) -> None:
+        """Grava o DataFrame limpo no cache Parquet (falhas só geram aviso)"""
+        try:
+            # Grava em arquivo temporário e renomeia, para outro processo nunca ler um Parquet pela metade
+            tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+            df.to_parquet(tmp_path, compression='zstd')
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning("Não foi possível gravar o cache em %s: %s", cache_path, e)
+    
+    def _load_via_openpyxl_readonly(self, file_path: Path, planilha_type: str) -> pd.DataFrame:
+        """
+        Lê a aba principal com openpyxl em modo read-only (linhas em streaming)
+        
+        Evita carregar a pasta de trabalho inteira em memória, como faz o
+        leitor padrão do pandas. A primeira linha não vazia vira o cabeçalho.
+        
+        Args:
+            file_path: Caminho do arquivo
+            planilha_type: Tipo da planilha
+            
+        Returns:
+            pd.DataFrame: Dados brutos da aba principal
+        """
+        usecols = self._usecols_for(planilha_type)
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            if planilha_type in self._MULTI_SHEET_TYPES:
+                sheet = workbook[self._get_main_sheet(workbook.sheetnames, planilha_type)]
+            else:
+                sheet = workbook.worksheets[0]
+            # Dimensões declaradas no arquivo nem sempre são confiáveis (o pandas faz o mesmo);
+            # sem elas cada linha vem só até a última célula preenchida
+            sheet.reset_dimensions()
+            rows = [row for row in sheet.iter_rows(values_only=True)
+                    if any(value is not None for value in row)]
+        finally:
+            workbook.close()
+        
+        if not rows:
+            return pd.DataFrame()
+        
+        # Largura da planilha é a da linha mais larga, não a do cabeçalho: um título curto
+        # (ex.: "BASE DIAS UTEIS ..." sem nada ao lado) não pode descartar as demais colunas
+        width = max(len(row) for row in rows)
+        header = rows[0] + (None,) * (width - len(rows[0]))
+        
+        # Cabeçalho no mesmo formato do pd.read_excel ("Unnamed: i" e duplicadas com ".n")
+        columns = []
+        seen = {}
+        for i, name in enumerate(header):
+            name = f"Unnamed: {i}" if name is None else name
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            columns.append(name)
+        
+        # Mesma seleção de colunas do usecols do pd.read_excel
+        keep = [i for i, name in enumerate(columns) if usecols is None or usecols(str(name))]
+        data = [[row[i] if i < len(row) else None for i in keep] for row in rows[1:]]
+        
+        return pd.DataFrame(data, columns=[columns[i] for i in keep])
+    
+    def _usecols_for(self, planilha_type: str) -> Optional[Callable[[str], bool]]:
+        """
+        Predicado de usecols para ler só as colunas que o cleaner mantém
+        
+        Args:
+            planilha_type: Tipo da planilha
+            
+        Returns:
+            Callable: Predicado sobre o nome da coluna, ou None para ler todas
+        """
+        keywords = self._USECOLS_KEYWORDS.get(planilha_type)
+        if keywords is None:
             return None
+        return lambda col: any(keyword in str(col).lower() for keyword in keywords)
     
-    def _get_main_sheet(self, xl_file, planilha_type: str) -> str:
+    def _get_main_sheet(self, sheets: List[str], planilha_type: str) -> str:
         """
         Identifica a aba principal da planilha
         
         Args:
-            xl_file: Arquivo Excel
+            sheets: Nomes das abas do arquivo Excel
             planilha_type: Tipo da planilha
             
         Returns:
             str: Nome da aba principal
         """
-        sheets = xl_file.sheet_names
-        
         # Se só há uma aba, usar ela
         if len(sheets) == 1:
             return sheets[0]
@@ -179,7 +439,7 @@ class ExcelLoader:
         df = df.dropna(how='all')
         
         # Limpar nomes das colunas
-        df.columns = [self._clean_column_name(str(col)) for col in df.columns]
+        df.columns = self._clean_column_names(df.columns)
         
         # Tratamentos específicos por tipo de planilha
         if planilha_type == "ativos":
@@ -203,37 +463,105 @@ class ExcelLoader:
         elif planilha_type == "exterior":
             df = self._clean_exterior(df)
         
-        # Remover linhas vazias novamente após limpeza
-        df = df.dropna(how='all')
-        
         # Aplicar mapeamento de sindicatos se for planilha de ativos
         if planilha_type == 'ativos':
             df = self._apply_sindicato_mapping(df)
         
+        return self._optimize_dtypes(df)
+    
+    def _optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reduz a memória do DataFrame limpo sem alterar valores
+        
+        - matrícula vira inteiro anulável (Int64) quando todos os valores são inteiros
+        - inteiros e floats são reduzidos ao menor tipo que os representa sem perda
+        - colunas de texto repetitivas (_CATEGORY_COLUMNS) viram category
+        
+        Args:
+            df: DataFrame limpo
+            
+        Returns:
+            pd.DataFrame: DataFrame com tipos otimizados
+        """
+        if df.empty or not df.columns.is_unique:
+            return df
+        
+        if 'matricula' in df.columns:
+            matricula = pd.to_numeric(df['matricula'], errors='coerce')
+            # Só converte se nenhum valor se perder (texto ou matrícula fracionária)
+            if matricula.notna().equals(df['matricula'].notna()) and (matricula.dropna() % 1 == 0).all():
+                df['matricula'] = matricula.astype('Int64')
+        
+        numeric_cols = df.select_dtypes(include='number').columns.drop('matricula', errors='ignore')
+        for col in numeric_cols:
+            values = df[col]
+            if pd.api.types.is_integer_dtype(values):
+                df[col] = pd.to_numeric(values, downcast='integer')
+            else:
+                reduced = pd.to_numeric(values, downcast='float')
+                # float32 arredonda valores como 35.1: só reduz se a conversão for exata
+                if ((reduced.astype('float64') == values) | values.isna()).all():
+                    df[col] = reduced
+        
+        for col in self._CATEGORY_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype) \
+                    and not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].astype('category')
+        
         return df
     
-    def _clean_column_name(self, col_name: str) -> str:
+    def _clean_column_names(self, columns: pd.Index) -> pd.Index:
         """
-        Limpa nome de coluna removendo caracteres especiais e padronizando
+        Limpa nomes de colunas removendo caracteres especiais e padronizando
+        
+        Aplica as substituições sobre o índice inteiro (métodos .str),
+        em vez de uma chamada Python por coluna.
         
         Args:
-            col_name: Nome original da coluna
+            columns: Nomes originais das colunas
             
         Returns:
-            str: Nome limpo da coluna
+            pd.Index: Nomes limpos das colunas
+        """
+        return (pd.Index(columns).astype(str)
+                # Remover caracteres especiais (incluindo \xa0)
+                .str.replace(self._RE_NONWORD, ' ', regex=True)
+                # Remover espaços extras e converter para minúsculas
+                .str.replace(self._RE_SPACES, ' ', regex=True)
+                .str.strip()
+                .str.lower()
+                # Substituir espaços por underscores
+                .str.replace(' ', '_', regex=False)
+                # Remover underscores múltiplos e no início e fim
+                .str.replace(self._RE_MULTI_US, '_', regex=True)
+                .str.strip('_'))
+    
+    def _match_cols(self, cols: pd.Index, rules: List[Tuple[str, str]]) -> Dict[str, str]:
         """
-        # Remover caracteres especiais (incluindo \xa0)
-        clean_name = re.sub(r'[^\w\s]', ' ', str(col_name))
-        # Remover espaços extras e converter para minúsculas
-        clean_name = re.sub(r'\s+', ' ', clean_name).strip().lower()
-        # Substituir espaços por underscores
-        clean_name = clean_name.replace(' ', '_')
-        # Remover underscores múltiplos
-        clean_name = re.sub(r'_+', '_', clean_name)
-        # Remover underscores no início e fim
-        clean_name = clean_name.strip('_')
+        Mapeia colunas para nomes padronizados a partir de regras (padrão, destino)
         
-        return clean_name
+        Cada regra vira uma máscara sobre o índice inteiro; vale a primeira
+        regra que casar com a coluna (mesma precedência de um if/elif).
+        
+        Args:
+            cols: Colunas do DataFrame
+            rules: Lista ordenada de (regex, nome de destino)
+            
+        Returns:
+            Dict[str, str]: Mapeamento coluna original -> nome padronizado
+        """
+        cols_lower = pd.Index(cols).astype(str).str.lower().str.strip()
+        masks = [cols_lower.str.contains(pattern, regex=True) for pattern, _ in rules]
+        targets = np.select(masks, [target for _, target in rules], default='')
+        return {col: target for col, target in zip(cols, targets.tolist()) if target}
+    
+    def _filter_valid_matricula(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Mantém apenas linhas com matrícula preenchida (uma única máscara e seleção)"""
+        if 'matricula' not in df.columns:
+            return df
+        
+        matricula = df['matricula']
+        return df.loc[matricula.notna() & (matricula != '')]
     
     def _clean_ativos(self, df: pd.DataFrame) -> pd.DataFrame:
         """Limpa dados da planilha de funcionários ativos"""
@@ -246,14 +574,10 @@ class ExcelLoader:
             'sindicato': 'sindicato'
         }
         
-        df = df.rename(columns=column_mapping)
+        df.columns = [column_mapping.get(col, col) for col in df.columns]
         
         # Filtrar apenas linhas com matrícula válida
-        if 'matricula' in df.columns:
-            df = df[df['matricula'].notna()]
-            df = df[df['matricula'] != '']
-        
-        return df
+        return self._filter_valid_matricula(df)
     
     def _clean_sindicatos(self, df: pd.DataFrame) -> pd.DataFrame:
         """Limpa dados da planilha de sindicatos"""
@@ -262,15 +586,13 @@ class ExcelLoader:
         
         # Primeira coluna geralmente é o sindicato, segunda o valor
         if len(cols) >= 2:
-            df = df.rename(columns={
-                cols[0]: 'sindicato',
-                cols[1]: 'valor_dia_sindicato'
-            })
+            column_mapping = {cols[0]: 'sindicato', cols[1]: 'valor_dia_sindicato'}
+            df.columns = [column_mapping.get(col, col) for col in df.columns]
         
-        # Filtrar apenas linhas com dados válidos
-        df = df[df['sindicato'].notna()]
-        df = df[df['sindicato'] != '']
-        df = df[~df['sindicato'].str.upper().str.contains('ESTADO|SINDICADO', na=False)]
+        # Filtrar apenas linhas com dados válidos (uma única máscara, sem upper intermediário)
+        sindicato = df['sindicato']
+        mask = sindicato.notna() & (sindicato != '') & ~sindicato.str.contains('ESTADO|SINDICADO', case=False, na=False)
+        df = df.loc[mask]
         
         return df
     
@@ -280,77 +602,56 @@ class ExcelLoader:
         
         # Primeira coluna é sindicato, segunda é dias úteis
         if len(cols) >= 2:
-            df = df.rename(columns={
-                cols[0]: 'sindicato',
-                cols[1]: 'dias_uteis_sindicato'
-            })
+            column_mapping = {cols[0]: 'sindicato', cols[1]: 'dias_uteis_sindicato'}
+            df.columns = [column_mapping.get(col, col) for col in df.columns]
         
-        # Filtrar apenas linhas com dados válidos
-        df = df[df['sindicato'].notna()]
-        df = df[df['sindicato'] != '']
-        df = df[~df['sindicato'].str.upper().str.contains('SINDICADO|DIAS', na=False)]
+        # Filtrar apenas linhas com dados válidos (uma única máscara, sem upper intermediário)
+        sindicato = df['sindicato']
+        mask = sindicato.notna() & (sindicato != '') & ~sindicato.str.contains('SINDICADO|DIAS', case=False, na=False)
+        df = df.loc[mask]
         
         return df
     
     def _clean_desligados(self, df: pd.DataFrame) -> pd.DataFrame:
         """Limpa dados da planilha de desligados"""
         # Mapear colunas baseado no conteúdo real
-        column_mapping = {}
-        for col in df.columns:
-            col_lower = str(col).lower().strip()
-            if 'matricula' in col_lower:
-                column_mapping[col] = 'matricula'
-            elif 'demiss' in col_lower or 'desligamento' in col_lower:
-                column_mapping[col] = 'data_desligamento'
-            elif 'comunicado' in col_lower:
-                column_mapping[col] = 'data_comunicado_desligamento'
-        
-        df = df.rename(columns=column_mapping)
+        column_mapping = self._match_cols(df.columns, [
+            ('matricula', 'matricula'),
+            ('comunicado', 'data_comunicado_desligamento'),
+            ('demiss|desligamento', 'data_desligamento'),
+        ])
         
-        if 'matricula' in df.columns:
-            df = df[df['matricula'].notna()]
+        df.columns = [column_mapping.get(col, col) for col in df.columns]
         
-        return df
+        return self._filter_valid_matricula(df)
 
     
 
     def _clean_ferias(self, df: pd.DataFrame) -> pd.DataFrame:
         """Limpa dados da planilha de férias"""
-        column_mapping = {}
-        for col in df.columns:
-            col_lower = str(col).lower().strip()
-            if 'matricula' in col_lower:
-                column_mapping[col] = 'matricula'
-            elif 'situacao' in col_lower or 'situação' in col_lower:
-                column_mapping[col] = 'situacao'
-            elif 'ferias' in col_lower or 'férias' in col_lower:
-                column_mapping[col] = 'dias_ferias'
-        
-        df = df.rename(columns=column_mapping)
+        column_mapping = self._match_cols(df.columns, [
+            ('matricula', 'matricula'),
+            ('situacao|situação', 'situacao'),
+            ('ferias|férias', 'dias_ferias'),
+        ])
         
-        if 'matricula' in df.columns:
-            df = df[df['matricula'].notna()]
+        df.columns = [column_mapping.get(col, col) for col in df.columns]
         
-        return df
+        return self._filter_valid_matricula(df)
 
     
 
     def _clean_admissoes(self, df: pd.DataFrame) -> pd.DataFrame:
         """Limpa dados da planilha de admissões"""
-        column_mapping = {}
-        for col in df.columns:
-            col_lower = str(col).lower().strip()
-            if 'matricula' in col_lower:
-                column_mapping[col] = 'matricula'
-            elif 'admiss' in col_lower:
-                column_mapping[col] = 'data_admissao'
-            elif 'cargo' in col_lower:
-                column_mapping[col] = 'cargo'
-        
-        df = df.rename(columns=column_mapping)
+        column_mapping = self._match_cols(df.columns, [
+            ('matricula', 'matricula'),
+            ('admiss', 'data_admissao'),
+            ('cargo', 'cargo'),
+        ])
         
-        if 'matricula' in df.columns:
-            df = df[df['matricula'].notna()]
+        df.columns = [column_mapping.get(col, col) for col in df.columns]
+        
+        df = self._filter_valid_matricula(df)
         
         # Remover colunas extras, manter apenas as esperadas
         expected_cols = ['matricula', 'data_admissao', 'cargo']
@@ -360,18 +661,14 @@ class ExcelLoader:
 
     def _clean_afastados(self, df: pd.DataFrame) -> pd.DataFrame:
         """Limpa dados da planilha de afastados"""
-        column_mapping = {}
-        for col in df.columns:
-            col_lower = str(col).lower().strip()
-            if 'matricula' in col_lower:
-                column_mapping[col] = 'matricula'
-            elif 'situacao' in col_lower or 'situação' in col_lower:
-                column_mapping[col] = 'afastamento_tipo'
+        column_mapping = self._match_cols(df.columns, [
+            ('matricula', 'matricula'),
+            ('situacao|situação', 'afastamento_tipo'),
+        ])
         
-        df = df.rename(columns=column_mapping)
+        df.columns = [column_mapping.get(col, col) for col in df.columns]
         
-        if 'matricula' in df.columns:
-            df = df[df['matricula'].notna()]
+        df = self._filter_valid_matricula(df)
         
         # Remover colunas extras
         expected_cols = ['matricula', 'afastamento_tipo']
@@ -383,18 +680,14 @@ class ExcelLoader:
 
     def _clean_estagio(self, df: pd.DataFrame) -> pd.DataFrame:
         """Limpa dados da planilha de estágio"""
-        column_mapping = {}
-        for col in df.columns:
-            col_lower = str(col).lower().strip()
-            if 'matricula' in col_lower:
-                column_mapping[col] = 'matricula'
-            elif 'cargo' in col_lower or 'titulo' in col_lower:
-                column_mapping[col] = 'titulo_do_cargo'
+        column_mapping = self._match_cols(df.columns, [
+            ('matricula', 'matricula'),
+            ('cargo|titulo', 'titulo_do_cargo'),
+        ])
         
-        df = df.rename(columns=column_mapping)
+        df.columns = [column_mapping.get(col, col) for col in df.columns]
         
-        if 'matricula' in df.columns:
-            df = df[df['matricula'].notna()]
+        df = self._filter_valid_matricula(df)
         
         # Remover colunas extras
         expected_cols = ['matricula', 'titulo_do_cargo']
@@ -411,12 +704,9 @@ class ExcelLoader:
             'titulo_do_cargo': 'titulo_do_cargo'
         }
         
-        df = df.rename(columns=column_mapping)
+        df.columns = [column_mapping.get(col, col) for col in df.columns]
         
-        if 'matricula' in df.columns:
-            df = df[df['matricula'].notna()]
-        
-        return df
+        return self._filter_valid_matricula(df)
     
     def _clean_exterior(self, df: pd.DataFrame) -> pd.DataFrame:
         """Limpa dados da planilha de exterior"""
@@ -431,12 +721,9 @@ class ExcelLoader:
             if len(cols) >= 3:
                 new_mapping[cols[2]] = 'observacao'
             
-            df = df.rename(columns=new_mapping)
+            df.columns = [new_mapping.get(col, col) for col in df.columns]
         
-        if 'matricula' in df.columns:
-            df = df[df['matricula'].notna()]
-        
-        return df
+        return self._filter_valid_matricula(df)
     
     def validate_required_files(self, spreadsheets: Dict[str, pd.DataFrame]) -> List[str]:
         """
@@ -523,7 +810,13 @@ class ExcelLoader:
             'SITEPD PR - SIND DOS TRAB EM EMPR PRIVADAS DE PROC DE DADOS DE CURITIBA E REGIAO METROPOLITANA': 'Paraná'
         }
         
-        # Aplicar mapeamento
-        df['sindicato'] = df['sindicato'].map(mapeamento_sindicatos).fillna(df['sindicato'])
+        # Aplicar mapeamento sobre as categorias (poucos valores distintos), não linha a linha
+        sindicato = df['sindicato'].astype('category')
+        novas_categorias = pd.Index([mapeamento_sindicatos.get(c, c) for c in sindicato.cat.categories])
+        if novas_categorias.is_unique:
+            df['sindicato'] = sindicato.cat.rename_categories(novas_categorias)
+        else:
+            # Nome simplificado já presente na planilha: categorias precisam ser unidas
+            df['sindicato'] = sindicato.map(dict(zip(sindicato.cat.categories, novas_categorias))).astype('category')
         
         return df
\ No newline at end of file
@@ -6,7 +6,7 @@ import sqlite3
 import tempfile
 import threading
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import pandas as pd
 
@@ -15,6 +15,20 @@ logger = logging.getLogger(__name__)
 class VRDatabaseManager:
     """Gerenciador do banco de dados SQLite para dados de VR/VA"""
     
+    # Mapeamento de planilhas para tabelas
+    TABLE_MAPPING = {
+        'ativos': 'funcionarios_ativos',
+        'sindicatos': 'sindicatos',
+        'dias_uteis': 'dias_uteis',
+        'ferias': 'ferias',
+        'afastados': 'afastados',
+        'desligados': 'desligados',
+        'admissoes': 'admissoes',
+        'estagio': 'estagio',
+        'aprendiz': 'aprendiz',
+        'exterior': 'exterior'
+    }
+    
     def __init__(self, db_path: Optional[str] = None):
         """
         Inicializa o gerenciador do banco de dados
@@ -235,27 +249,21 @@ class VRDatabaseManager:
         Args:
             spreadsheets: Dicionário com DataFrames das planilhas
         """
-        conn, cursor = self._get_connection()
-        
-       # Mapeamento de planilhas para tabelas
-        table_mapping = {
-            'ativos': 'funcionarios_ativos',
-            'sindicatos': 'sindicatos',
-            'dias_uteis': 'dias_uteis',
-            'ferias': 'ferias',
-            'afastados': 'afastados',
-            'desligados': 'desligados',
-            'admissoes': 'admissoes',
-            'estagio': 'estagio',
-            'aprendiz': 'aprendiz',
-            'exterior': 'exterior'
-        }
-        
         for planilha_name, df in spreadsheets.items():
-            if planilha_name in table_mapping and not df.empty:
-                table_name = table_mapping[planilha_name]
-                self._insert_dataframe_to_table(df, table_name)
-                logger.info(f"Dados da planilha '{planilha_name}' carregados na tabela '{table_name}'")
+            self.load_one(planilha_name, df)
+    
+    def load_one(self, planilha_name: str, df: pd.DataFrame) -> None:
+        """
+        Carrega os dados de uma única planilha na tabela correspondente
+        
+        Args:
+            planilha_name: Tipo da planilha (chave de TABLE_MAPPING)
+            df: DataFrame da planilha
+        """
+        if planilha_name in self.TABLE_MAPPING and not df.empty:
+            table_name = self.TABLE_MAPPING[planilha_name]
+            self._insert_dataframe_to_table(df, table_name)
+            logger.info(f"Dados da planilha '{planilha_name}' carregados na tabela '{table_name}'")
     
     def _insert_dataframe_to_table(self, df: pd.DataFrame, table_name: str) -> None:
         """
@@ -284,42 +292,47 @@ class VRDatabaseManager:
         # Preparar dados para inserção
         columns = list(df_clean.columns)
         placeholders = ', '.join(['?' for _ in columns])
+        insert_sql = f"INSERT INTO {self._escape_identifier(table_name)} ({', '.join([self._escape_identifier(col) for col in columns])}) VALUES ({placeholders})"
+        
+        # Converter coluna a coluna e montar as linhas de uma vez (sem iterrows)
+        converted = [[self._to_sql_value(val) for val in df_clean.iloc[:, i].astype(object)]
+                     for i in range(len(columns))]
+        rows = list(zip(*converted))
         
-        # Inserir dados com tratamento melhorado
+        # Inserir em lote com uma única chamada executemany
         inserted_count = 0
         error_count = 0
         
-        for _, row in df_clean.iterrows():
-            try:
-                # Tratar valores especiais
-                values = []
-                for val in row.values:
-                    if pd.isna(val):
-                        values.append(None)
-                    elif isinstance(val, (int, float)):
-                        values.append(val)
-                    elif isinstance(val, str):
-                        # Limpar strings
-                        clean_val = str(val).strip()
-                        values.append(clean_val if clean_val else None)
-                    else:
-                        values.append(str(val))
-                
-                # Executar inserção
-                cursor.execute(
-                    f"INSERT INTO {self._escape_identifier(table_name)} ({', '.join([self._escape_identifier(col) for col in columns])}) VALUES ({placeholders})",
-                    values
-                )
-                inserted_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                logger.warning(f"Erro ao inserir linha na tabela {table_name}: {e}")
-                continue
+        try:
+            cursor.executemany(insert_sql, rows)
+            inserted_count = len(rows)
+        except Exception as e:
+            # Lote rejeitado: refazer linha a linha para isolar os registros com erro
+            conn.rollback()
+            logger.warning(f"Inserção em lote na tabela {table_name} falhou ({e}), inserindo linha a linha")
+            for values in rows:
+                try:
+                    cursor.execute(insert_sql, values)
+                    inserted_count += 1
+                except Exception as e:
+                    error_count += 1
+                    logger.warning("Erro ao inserir linha na tabela %s: %s", table_name, e)
         
         conn.commit()
         logger.info(f"Tabela {table_name}: {inserted_count} registros inseridos, {error_count} erros")
     
+    def _to_sql_value(self, val: Any) -> Any:
+        """Converte um valor do DataFrame para o formato gravado no SQLite"""
+        if pd.isna(val):
+            return None
+        if isinstance(val, (int, float)):
+            return val
+        if isinstance(val, str):
+            # Limpar strings
+            clean_val = val.strip()
+            return clean_val if clean_val else None
+        return str(val)
+    
     def clear_all_data(self) -> None:
         """Remove todos os dados das tabelas"""
         conn, cursor = self._get_connection()
@@ -399,15 +412,18 @@ class VRDatabaseManager:
         
         return schema_info
     
-    def execute_query(self, query: str) -> List[Dict[str, Any]]:
+    def _run_query(self, query: str) -> Tuple[List[str], List[tuple]]:
         """
-        Executa uma consulta SQL e retorna os resultados
+        Executa uma consulta SQL e retorna colunas e linhas brutas do cursor
+        
+        Base de execute_query e execute_query_columnar, que só mudam o formato do resultado.
         
         Args:
             query: Consulta SQL
             
         Returns:
-            List[Dict[str, Any]]: Resultados da consulta
+            Tuple[List[str], List[tuple]]: Nomes das colunas e linhas (ambos vazios para
+            comandos sem resultado, como INSERT/UPDATE/DELETE)
         """
         try:
             conn, cursor = self._get_connection()
@@ -418,19 +434,50 @@ class VRDatabaseManager:
             if cursor.description is None:
                 conn.commit()
                 logger.info(f"Comando executado com sucesso")
-                return []
+                return [], []
             
             # Para comandos SELECT, processar resultados
             columns = [description[0] for description in cursor.description]
-            results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            rows = cursor.fetchall()
             
-            logger.info(f"Consulta executada com sucesso. {len(results)} registros retornados")
-            return results
+            logger.info(f"Consulta executada com sucesso. {len(rows)} registros retornados")
+            return columns, rows
             
         except Exception as e:
             logger.error(f"Erro ao executar consulta: {e}")
             raise Exception(f"Erro ao executar consulta: {str(e)}")
     
+    def execute_query(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Executa uma consulta SQL e retorna os resultados
+        
+        Args:
+            query: Consulta SQL
+            
+        Returns:
+            List[Dict[str, Any]]: Resultados da consulta
+        """
+        columns, rows = self._run_query(query)
+        return [dict(zip(columns, row)) for row in rows]
+    
+    def execute_query_columnar(self, query: str) -> Dict[str, List[Any]]:
+        """
+        Executa uma consulta SQL e retorna os resultados por coluna
+        
+        Mesma consulta de execute_query, mas transposta uma única vez com zip(*rows):
+        o resultado vai direto para pd.DataFrame sem montar um dicionário por linha.
+        
+        Args:
+            query: Consulta SQL
+            
+        Returns:
+            Dict[str, List[Any]]: Valores de cada coluna, na ordem das linhas
+            (colunas com listas vazias em um SELECT sem linhas; {} para comandos sem resultado)
+        """
+        columns, rows = self._run_query(query)
+        values = zip(*rows) if rows else ([] for _ in columns)
+        return {column: list(column_values) for column, column_values in zip(columns, values)}
+    
     def save_processing_result(self, resultado: Dict[str, Any]) -> None:
         """
         Salva resultado de processamento no banco
@@ -135,15 +135,16 @@ class VRAgentRefactored:
             # 5. Aplicar exclusões
             logger.info("🚫 Aplicando exclusões...")
             df_base = self._get_ativos_from_database()
-            df_elegiveis, exclusoes_aplicadas = self.calculator.apply_exclusions_from_db(df_base)
+            # Os DataFrames intermediários não são reutilizados: cada etapa altera o anterior sem copiá-lo
+            df_elegiveis, exclusoes_aplicadas = self.calculator.apply_exclusions_from_db(df_base, inplace=True)
             
             # 6. Calcular dias úteis
             logger.info("📊 Calculando dias úteis...")
-            df_com_dias = self.calculator.calculate_working_days_from_db(df_elegiveis, ano, mes)
+            df_com_dias = self.calculator.calculate_working_days_from_db(df_elegiveis, ano, mes, inplace=True)
             
             # 7. Calcular valores de VR
             logger.info("💰 Calculando valores de VR...")
-            df_final = self.calculator.calculate_vr_values_from_db(df_com_dias)
+            df_final = self.calculator.calculate_vr_values_from_db(df_com_dias, inplace=True)
             
             # 8. Gerar resumos
             logger.info("📈 Gerando resumos...")
@@ -0,0 +1,65 @@
+"""
+Testes do carregamento de planilhas (leitura via openpyxl read-only)
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_loader import ExcelLoader  # noqa: E402
+
+
+def _write_workbook(path: Path, rows) -> Path:
+    """Grava as linhas (listas de valores) na primeira aba de um novo XLSX"""
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    monkeypatch.setenv("EXCEL_LOADER_NO_CACHE", "1")
+    return ExcelLoader()
+
+
+def test_titulo_curto_nao_descarta_colunas(tmp_path, loader):
+    """Título de uma célula só (como em 'Base dias uteis') mantém a largura da planilha"""
+    path = _write_workbook(tmp_path / "Base dias uteis.xlsx", [
+        ["BASE DIAS UTEIS DE 15/04 a 15/05"],
+        ["SINDICADO", "DIAS UTEIS"],
+        ["SINDPD RJ", 21],
+        ["SINDPD SP", 22],
+    ])
+
+    df = loader._load_via_openpyxl_readonly(path, "dias_uteis")
+    expected = pd.read_excel(path, engine="openpyxl")
+
+    assert list(df.columns) == list(expected.columns)
+    assert df.astype(object).values.tolist() == expected.astype(object).values.tolist()
+
+    clean = loader._clean_dataframe(df, "dias_uteis")
+    assert clean["sindicato"].astype(str).tolist() == ["SINDPD RJ", "SINDPD SP"]
+    assert clean["dias_uteis_sindicato"].tolist() == [21, 22]
+
+
+def test_coluna_sem_cabecalho_e_mantida(tmp_path, loader):
+    """Coluna de dados sem cabeçalho (observação do EXTERIOR) vira 'Unnamed: i'"""
+    path = _write_workbook(tmp_path / "EXTERIOR.xlsx", [
+        ["Cadastro", "Valor"],
+        [1012, 100, "retorno em junho"],
+        [1013, 200, None],
+    ])
+
+    df = loader._load_via_openpyxl_readonly(path, "exterior")
+    assert list(df.columns) == ["Cadastro", "Valor", "Unnamed: 2"]
+
+    clean = loader._clean_dataframe(df, "exterior")
+    assert list(clean.columns) == ["matricula", "valor", "observacao"]
+    assert clean["observacao"].iloc[0] == "retorno em junho"
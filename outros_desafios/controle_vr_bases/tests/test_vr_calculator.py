@@ -0,0 +1,69 @@
+"""
+Testes do cálculo de VR via banco (exclusões e dias úteis)
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from calculator import VRCalculator  # noqa: E402
+
+SEM_DESLIGADOS = {'matricula': [], 'data_desligamento': [], 'data_comunicado_desligamento': []}
+
+
+class _FakeDB:
+    """Responde às consultas com tabelas fixas, escolhidas pela tabela do FROM"""
+
+    def __init__(self, **tabelas):
+        self.tabelas = tabelas
+
+    def execute_query_columnar(self, query):
+        # A consulta de exclusões (UNION) começa por 'FROM afastados'
+        for tabela, resultado in self.tabelas.items():
+            if f'FROM {tabela}' in query:
+                return resultado
+        return {'matricula': []}
+
+
+def test_placeholder_matricula_does_not_exclude_non_numeric_ids():
+    db = _FakeDB(
+        afastados={'matricula': ['N/D', '1002'], 'motivo': ['afastados'] * 2, 'ordem': [1, 1]},
+        desligados={'matricula': ['N/D'], 'data_desligamento': ['2025-05-10'],
+                    'data_comunicado_desligamento': ['OK']},
+    )
+    ativos = pd.DataFrame({'matricula': ['1001', 'X7', '1002'], 'sindicato': ['SIND A'] * 3})
+
+    elegiveis, exclusoes = VRCalculator(db).apply_exclusions_from_db(ativos)
+
+    assert elegiveis['matricula'].tolist() == ['1001', 'X7']
+    assert 'Excluídos afastados: 1 funcionários' in exclusoes
+    assert 'Excluídos desligados: 0 funcionários' in exclusoes
+
+
+def test_numeric_matricula_matches_across_types():
+    db = _FakeDB(
+        afastados={'matricula': [1001.0], 'motivo': ['exterior'], 'ordem': [4]},
+        desligados=SEM_DESLIGADOS,
+    )
+    ativos = pd.DataFrame({'matricula': [' 1001 ', '1002'], 'sindicato': ['SIND A'] * 2})
+
+    elegiveis, _ = VRCalculator(db).apply_exclusions_from_db(ativos)
+
+    assert elegiveis['matricula'].tolist() == ['1002']
+
+
+def test_working_days_stay_integer():
+    db = _FakeDB(
+        dias_uteis={'sindicato': ['SIND A'], 'dias_uteis_sindicato': [21]},
+        ferias={'matricula': ['1002'], 'dias_ferias': [10], 'dias_comprados': [0], 'situacao': ['Férias']},
+        admissoes={'matricula': ['1003'], 'data_admissao': ['2025-05-20']},
+    )
+    base = pd.DataFrame({'matricula': ['1001', '1002', '1003', '1004'],
+                         'sindicato': ['SIND A', 'SIND A', 'SIND A', 'SIND B']})
+
+    resultado = VRCalculator(db).calculate_working_days_from_db(base, 2025, 5)
+
+    assert resultado['dias_vr'].dtype == 'int64'
+    assert resultado['dias_vr'].tolist() == [21, 11, 12, 22]